@@ -0,0 +1,23 @@
+"""diagnosis model version
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Which model version produced each diagnosis; NULL for rows made before tracking
+    op.add_column('diagnoses', sa.Column('model_version', sa.String(), nullable=True))
+
+def downgrade() -> None:
+    with op.batch_alter_table('diagnoses') as batch_op:
+        batch_op.drop_column('model_version')
@@ -0,0 +1,27 @@
+"""history pagination indexes
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Keyset pagination over (created_at, id) within a user's history
+    op.create_index('ix_conversations_user_created_id', 'conversations', ['user_id', 'created_at', 'id'])
+    op.create_index('ix_diagnoses_user_created_id', 'diagnoses', ['user_id', 'created_at', 'id'])
+
+    # Loading a conversation's messages in order
+    op.create_index('ix_messages_conversation_id_id', 'messages', ['conversation_id', 'id'])
+
+def downgrade() -> None:
+    op.drop_index('ix_messages_conversation_id_id', table_name='messages')
+    op.drop_index('ix_diagnoses_user_created_id', table_name='diagnoses')
+    op.drop_index('ix_conversations_user_created_id', table_name='conversations')
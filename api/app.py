@@ -15,8 +15,15 @@ if project_root not in sys.path:
 # Import routes
 from api.routes import auth_routes, chatbot_routes, diagnosis_routes
 from api.models import user_models, chat_models, diagnosis_models
-from api.database import get_db, Base, engine
+from api.database import Base, async_engine, missing_columns, ReadSessionLocal
 from api.auth.utils import get_current_user, create_access_token
+from api.ml.batching import get_batcher
+from api.ml.inference import get_predictor
+from api.ml.prediction_cache import PREDICTION_CACHE_WARM_SETS, warm_prediction_cache
+from api.ml.model_watcher import get_model_watcher
+from api.write_behind import get_message_buffer
+from api.chat_sessions import get_chatbot
+from api import metrics
 
 # Create FastAPI app
 app = FastAPI(
@@ -43,8 +50,32 @@ app.include_router(diagnosis_routes, prefix="/api/diagnosis", tags=["Diagnosis"]
 @app.on_event("startup")
 async def startup_event():
     # Initialize database
-    Base.metadata.create_all(bind=engine)
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        missing = await conn.run_sync(missing_columns)
+    if missing:
+        raise RuntimeError(
+            f"Database schema is out of date (missing {', '.join(missing)}); run `alembic upgrade head`"
+        )
     print("Database initialized")
+    get_batcher().start()
+    get_model_watcher().start()
+    if PREDICTION_CACHE_WARM_SETS > 0:
+        warmed = await warm_prediction_cache(get_predictor(), ReadSessionLocal)
+        print(f"Prediction cache warmed with {warmed} symptom sets")
+    if get_message_buffer() is not None:
+        get_message_buffer().start()
+    # Load the chat engine now rather than on the first /chat request
+    await get_chatbot()
+
+# Shutdown event
+@app.on_event("shutdown")
+async def shutdown_event():
+    get_model_watcher().stop()
+    await get_batcher().stop()
+    if get_message_buffer() is not None:
+        await get_message_buffer().stop()
+    await async_engine.dispose()
 
 # Root endpoint
 @app.get("/")
@@ -56,6 +87,11 @@ async def root():
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+# Metrics endpoint
+@app.get("/metrics")
+async def get_metrics():
+    return metrics.collect()
+
 # Run the application
 if __name__ == "__main__":
     uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
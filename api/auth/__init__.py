@@ -1,5 +1,6 @@
 # Import auth modules to make them available when importing from api.auth
 from . import utils
+from . import hashing
 
 # Re-export commonly used functions
 from .utils import (
@@ -8,4 +9,6 @@ from .utils import (
     create_access_token,
     get_current_user,
     get_current_active_user
-) 
\ No newline at end of file
+)
+from .hashing import get_password_hasher, PasswordHasherBusy
+from .principal_cache import Principal, get_principal_cache, invalidate_principal
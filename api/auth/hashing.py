@@ -0,0 +1,98 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, Any, Dict
+from passlib.context import CryptContext
+from ..metrics import Histogram, register_collector
+
+# bcrypt cost factor; hashes made with another cost are upgraded on next login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many password operations are already queued."""
+
+class PasswordHasher:
+    """
+    Run bcrypt on a small dedicated thread pool instead of the event loop.
+
+    bcrypt releases the GIL, so a few threads give real parallelism while the
+    loop keeps serving other requests. At most workers + max_queue operations
+    are admitted at once; beyond that callers get PasswordHasherBusy right away
+    instead of piling up behind a login burst.
+    """
+
+    def __init__(
+        self,
+        context: CryptContext = pwd_context,
+        workers: int = PASSWORD_HASH_WORKERS,
+        max_queue: int = PASSWORD_HASH_MAX_QUEUE
+    ):
+        self.context = context
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._in_flight = 0
+        self.rejected = 0
+        self.rehashed = 0
+        latency_buckets = [5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+        self.hash_latency_ms = Histogram(latency_buckets)
+        self.queue_wait_ms = Histogram([0.1, 1] + latency_buckets)
+
+    async def _run(self, fn: Callable, *args) -> Any:
+        if self._in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise PasswordHasherBusy("Too many password operations in progress")
+        self._in_flight += 1
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            result = fn(*args)
+            return result, started - submitted, time.perf_counter() - started
+
+        try:
+            result, waited, took = await asyncio.get_running_loop().run_in_executor(
+                self._executor, timed
+            )
+        finally:
+            self._in_flight -= 1
+        self.queue_wait_ms.observe(waited * 1000)
+        self.hash_latency_ms.observe(took * 1000)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password; also return a new hash if the stored one uses an outdated cost."""
+        valid, new_hash = await self._run(self.context.verify_and_update, password, hashed_password)
+        if new_hash is not None:
+            self.rehashed += 1
+        return valid, new_hash
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rounds": BCRYPT_ROUNDS,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "rejected": self.rejected,
+            "rehashed": self.rehashed,
+            "hash_latency_ms": self.hash_latency_ms.snapshot(),
+            "queue_wait_ms": self.queue_wait_ms.snapshot()
+        }
+
+_hasher: Optional[PasswordHasher] = None
+
+def get_password_hasher() -> PasswordHasher:
+    """Get the shared password hasher."""
+    global _hasher
+    if _hasher is None:
+        _hasher = PasswordHasher()
+        register_collector("password_hasher", _hasher.stats)
+    return _hasher
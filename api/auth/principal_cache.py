@@ -0,0 +1,187 @@
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from ..metrics import register_collector
+from ..models.db_models import User
+
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+
+@dataclass(frozen=True)
+class Principal:
+    """Detached snapshot of the user fields needed to authorize a request."""
+    id: int
+    username: str
+    email: Optional[str] = None
+    full_name: Optional[str] = None
+    is_active: bool = True
+    is_admin: bool = False
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            full_name=user.full_name,
+            is_active=bool(user.is_active),
+            is_admin=bool(user.is_admin)
+        )
+
+class PrincipalCacheBackend(ABC):
+    """
+    Storage interface for cached principals.
+
+    Only the per-process InMemoryBackend ships here, so each worker keeps its
+    own cache and an invalidation reaches only the worker that made the
+    change; other workers keep the old principal for up to the TTL.
+    Implementations shared between workers (e.g. Redis) should serialise the
+    principal themselves and honour the ttl passed to set().
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Principal]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, principal: Principal, ttl: float):
+        ...
+
+    @abstractmethod
+    def delete(self, key: str):
+        ...
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+class InMemoryBackend(PrincipalCacheBackend):
+    """Per-process LRU backend with per-entry expiry."""
+
+    def __init__(self, max_size: int = PRINCIPAL_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, Principal]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return principal
+
+    def set(self, key: str, principal: Principal, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, principal)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class PrincipalCache:
+    """Principals keyed by token subject (username), bounded by TTL and size."""
+
+    def __init__(self, backend: Optional[PrincipalCacheBackend] = None, ttl: float = PRINCIPAL_CACHE_TTL):
+        self.backend = backend if backend is not None else InMemoryBackend()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, username: str) -> Optional[Principal]:
+        principal = self.backend.get(username)
+        if principal is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return principal
+
+    def set(self, principal: Principal):
+        if self.ttl > 0:
+            self.backend.set(principal.username, principal, self.ttl)
+
+    def invalidate(self, username: str):
+        self.invalidations += 1
+        self.backend.delete(username)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations
+        }
+        if isinstance(self.backend, InMemoryBackend):
+            stats["size"] = len(self.backend)
+            stats["max_size"] = self.backend.max_size
+        return stats
+
+_cache: Optional[PrincipalCache] = None
+
+def get_principal_cache() -> PrincipalCache:
+    """Get the process-wide principal cache."""
+    global _cache
+    if _cache is None:
+        set_principal_cache(PrincipalCache())
+    return _cache
+
+def set_principal_cache(cache: PrincipalCache):
+    """Replace the principal cache, e.g. with one backed by a shared store."""
+    global _cache
+    _cache = cache
+    register_collector("principal_cache", cache.stats)
+
+def invalidate_principal(username: str):
+    """
+    Drop a cached principal. ORM updates and deletes of users are handled
+    automatically once committed; call this after committing bulk
+    UPDATE/DELETE statements on users.
+    """
+    get_principal_cache().invalidate(username)
+
+# Session.info key of the usernames changed in a session's transaction
+_CHANGED_USERS = "principal_cache_changed_users"
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _collect_changed_user(mapper, connection, target):
+    usernames = {target.username}
+    # A renamed user must also drop the entry under the old subject
+    usernames.update(inspect(target).attrs.username.history.deleted or ())
+    # Flushed, not yet committed: dropping the entry now would let a
+    # concurrent request cache the old row again until the TTL runs out
+    session = inspect(target).session
+    session.info.setdefault(_CHANGED_USERS, set()).update(u for u in usernames if u is not None)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session):
+    for username in session.info.pop(_CHANGED_USERS, ()):
+        invalidate_principal(username)
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_users(session):
+    session.info.pop(_CHANGED_USERS, None)
@@ -0,0 +1,119 @@
+import asyncio
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .metrics import register_collector
+from .models.db_models import Message
+from .session_store import SessionStore
+
+CHAT_SESSION_MAX = int(os.getenv("CHAT_SESSION_MAX", "10000"))
+CHAT_SESSION_TTL = float(os.getenv("CHAT_SESSION_TTL", "1800"))
+
+CHATBOT_RETRY_INTERVAL = float(os.getenv("CHATBOT_RETRY_INTERVAL", "60"))
+
+_chatbot = None
+_chatbot_error: Optional[str] = None
+_chatbot_failed_at = 0.0
+_session_store: Optional[SessionStore] = None
+_lock = threading.Lock()
+# conversation_id -> [lock, holders and waiters]; entries go once nobody uses them
+_conversation_locks: Dict[int, list] = {}
+
+def _should_load() -> bool:
+    return _chatbot is None and (
+        _chatbot_error is None or time.monotonic() - _chatbot_failed_at >= CHATBOT_RETRY_INTERVAL
+    )
+
+def load_chatbot():
+    """
+    Build the shared MedicalChatbot engine (blocking: loads spaCy and the
+    diagnosis models). Returns None if its NLP stack can't be loaded; the
+    load is tried again once CHATBOT_RETRY_INTERVAL seconds have passed.
+    """
+    global _chatbot, _chatbot_error, _chatbot_failed_at
+    if _should_load():
+        with _lock:
+            if _should_load():
+                try:
+                    from chatbot.main_chatbot import MedicalChatbot
+                    _chatbot = MedicalChatbot()
+                    _chatbot_error = None
+                except Exception as e:
+                    _chatbot_error = str(e)
+                    _chatbot_failed_at = time.monotonic()
+                    print(f"Warning: chatbot unavailable, using placeholder responses: {_chatbot_error}")
+    return _chatbot
+
+async def get_chatbot():
+    """
+    Get the shared chatbot engine, or None while it can't be loaded.
+    The engine is stateless per user; conversations pass their own state.
+    Loading runs in the thread pool so it never stalls the event loop.
+    """
+    if _chatbot is not None or not _should_load():
+        return _chatbot
+    return await run_in_threadpool(load_chatbot)
+
+def get_session_store() -> SessionStore:
+    """Get the per-process store of conversation states."""
+    global _session_store
+    if _session_store is None:
+        _session_store = SessionStore(max_sessions=CHAT_SESSION_MAX, ttl=CHAT_SESSION_TTL)
+        register_collector("chat_sessions", _session_store.stats)
+    return _session_store
+
+@asynccontextmanager
+async def conversation_turn(conversation_id: int) -> AsyncIterator[None]:
+    """
+    Serialize turns of one conversation: its state is loaded, advanced and
+    persisted by one request at a time. If the turn fails, the cached state
+    (possibly advanced past what was saved) is dropped, so the next turn
+    rebuilds it from the messages table.
+    """
+    entry = _conversation_locks.setdefault(conversation_id, [asyncio.Lock(), 0])
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            try:
+                yield
+            except BaseException:
+                if _session_store is not None:
+                    _session_store.pop(conversation_id)
+                raise
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0:
+            del _conversation_locks[conversation_id]
+
+def replay_state(chatbot, user_messages: List[str]):
+    """Rebuild a conversation's state by running its user messages through the flow again."""
+    from chatbot.main_chatbot import ConversationState
+    state = ConversationState()
+    for text in user_messages:
+        chatbot.process_input(text, state)
+    return state
+
+async def get_conversation_state(chatbot, db: AsyncSession, conversation_id: int, is_new: bool = False) -> Any:
+    """
+    Look up a conversation's state, rehydrating it from the messages table on a miss.
+    With write-behind enabled, messages still buffered at that point are not replayed.
+    """
+    store = get_session_store()
+    state = store.get(conversation_id)
+    if state is None:
+        user_messages = []
+        if not is_new:
+            result = await db.execute(
+                select(Message.content)
+                .where(Message.conversation_id == conversation_id, Message.role == "user")
+                .order_by(Message.id)
+            )
+            user_messages = result.scalars().all()
+        state = await run_in_threadpool(replay_state, chatbot, user_messages)
+        store.put(conversation_id, state)
+    return state
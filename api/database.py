@@ -1,7 +1,8 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from typing import Generator
+from typing import AsyncGenerator, Generator, List, Optional
 import os
 
 SQLALCHEMY_DATABASE_URL = os.getenv(
@@ -9,18 +10,140 @@ SQLALCHEMY_DATABASE_URL = os.getenv(
     "sqlite:///./medbot.db"
 )
 
+# Async drivers used by the API; scripts and migrations keep the sync engine
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+def to_async_url(url: str) -> str:
+    """Map a sync database URL onto the matching async driver."""
+    scheme, sep, rest = url.partition("://")
+    dialect = scheme.split("+", 1)[0]
+    if dialect in ASYNC_DRIVERS and scheme not in ASYNC_DRIVERS.values():
+        scheme = ASYNC_DRIVERS[dialect]
+    return f"{scheme}{sep}{rest}"
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", to_async_url(SQLALCHEMY_DATABASE_URL))
+
+# Connection pool settings for server databases
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+IS_SQLITE = SQLALCHEMY_DATABASE_URL.startswith("sqlite")
+
+# SQLite tuning applied to every new connection; see apply_sqlite_pragmas
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),  # negative = KiB
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+}
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record=None, read_only: bool = False):
+    """
+    Tune a new SQLite connection.
+
+    WAL lets readers run alongside the single writer, synchronous=NORMAL
+    only fsyncs at checkpoints (a power loss can drop the last commits but
+    never corrupts the file) and busy_timeout makes writers wait for the
+    lock instead of failing with "database is locked".
+    """
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        # The journal mode is a property of the file; only writers may change it
+        if read_only and name == "journal_mode":
+            continue
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+def to_read_only_url(url: str) -> Optional[str]:
+    """Open a file-backed SQLite URL read-only; None for in-memory databases."""
+    scheme, sep, path = url.partition(":///")
+    if not sep or path in ("", ":memory:") or path.startswith("file:"):
+        return None
+    return f"{scheme}:///file:{path}?mode=ro&uri=true"
+
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {}
+    connect_args={"check_same_thread": False} if IS_SQLITE else {}
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    **({} if IS_SQLITE else {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW})
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# Separate pool for history reads: a read-only SQLite connection, or a replica
+READ_DATABASE_URL = os.getenv(
+    "READ_DATABASE_URL",
+    (to_read_only_url(ASYNC_DATABASE_URL) if IS_SQLITE else None) or ASYNC_DATABASE_URL
+)
+
+read_engine = async_engine if READ_DATABASE_URL == ASYNC_DATABASE_URL else create_async_engine(
+    READ_DATABASE_URL,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    **({} if IS_SQLITE else {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW})
+)
+
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+if IS_SQLITE:
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+    if read_engine is not async_engine:
+        event.listen(
+            read_engine.sync_engine, "connect",
+            lambda dbapi_connection, connection_record: apply_sqlite_pragmas(dbapi_connection, read_only=True)
+        )
+
 Base = declarative_base()
 
+def missing_columns(connection) -> List[str]:
+    """
+    Columns of the models that existing tables lack, as "table.column".
+    create_all() only creates missing tables, so these need a migration.
+    """
+    inspector = inspect(connection)
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        missing += [f"{table.name}.{column.name}" for column in table.columns if column.name not in existing]
+    return missing
+
 def get_db() -> Generator:
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Session on the read pool, for endpoints that never write."""
+    async with ReadSessionLocal() as db:
+        yield db
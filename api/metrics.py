@@ -0,0 +1,42 @@
+from typing import Callable, Dict, List, Any
+import bisect
+import threading
+
+class Histogram:
+    """Cumulative bucketed histogram with count and sum, safe to share across threads."""
+
+    def __init__(self, buckets: List[float]):
+        self.buckets = sorted(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self._count += 1
+            self._sum += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = list(self._counts)
+            count, total = self._count, self._sum
+        buckets = {}
+        running = 0
+        for bound, n in zip(self.buckets + ["+Inf"], counts):
+            running += n
+            buckets[f"le_{bound}"] = running
+        return {"count": count, "sum": total, "buckets": buckets}
+
+# Named callables returning a JSON-serialisable snapshot, exposed by GET /metrics
+_collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+def register_collector(name: str, collector: Callable[[], Dict[str, Any]]):
+    """Register a metrics source under the given name."""
+    _collectors[name] = collector
+
+def collect() -> Dict[str, Any]:
+    """Snapshot every registered metrics source."""
+    return {name: collector() for name, collector in _collectors.items()}
@@ -0,0 +1,139 @@
+import asyncio
+import os
+from collections import deque
+from typing import Callable, List, Optional, Any, Dict
+from ..metrics import Histogram, register_collector
+from .inference import get_predictor
+
+MAX_BATCH_SIZE = int(os.getenv("DIAGNOSIS_MAX_BATCH_SIZE", "32"))
+MAX_WAIT_MS = float(os.getenv("DIAGNOSIS_MAX_WAIT_MS", "2"))
+
+class MicroBatcher:
+    """
+    Gather concurrent prediction requests into batches.
+
+    Callers await submit(); a single worker task waits until max_batch_size
+    items are queued or max_wait_ms has passed since the first one arrived,
+    runs predict_batch once in a worker thread and resolves every caller's
+    future with its own result. While a batch is being scored the next one
+    fills up, so under load batches grow without adding latency to idle
+    traffic beyond max_wait_ms.
+    """
+
+    def __init__(
+        self,
+        predict_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_wait_ms: float = MAX_WAIT_MS
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._pending = deque()
+        self._has_items: Optional[asyncio.Event] = None
+        self._batch_full: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.batch_sizes = Histogram([1, 2, 4, 8, 16, 32, 64, 128, 256])
+        self.queue_depths = Histogram([0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512])
+        self.batches = 0
+        self.items = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    def start(self):
+        """Start the worker task on the running event loop."""
+        if self._worker is not None and not self._worker.done():
+            return
+        self._has_items = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        if self._pending:
+            self._has_items.set()
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the worker and fail any requests still waiting."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        while self._pending:
+            _, future = self._pending.popleft()
+            if not future.done():
+                future.set_exception(RuntimeError("Prediction batcher stopped"))
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its prediction."""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self.queue_depths.observe(len(self._pending))
+        self._pending.append((item, future))
+        self._has_items.set()
+        if len(self._pending) >= self.max_batch_size:
+            self._batch_full.set()
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._has_items.wait()
+            if len(self._pending) < self.max_batch_size and self.max_wait_ms > 0:
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), self.max_wait_ms / 1000)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = []
+            while self._pending and len(batch) < self.max_batch_size:
+                batch.append(self._pending.popleft())
+            if not self._pending:
+                self._has_items.clear()
+            if len(self._pending) < self.max_batch_size:
+                self._batch_full.clear()
+            # Callers that gave up (e.g. client disconnects) are skipped
+            batch = [(item, future) for item, future in batch if not future.cancelled()]
+            if not batch:
+                continue
+
+            self.batches += 1
+            self.items += len(batch)
+            self.batch_sizes.observe(len(batch))
+            try:
+                results = await loop.run_in_executor(
+                    None, self.predict_batch, [item for item, _ in batch]
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "queue_depth": self.queue_depth,
+            "batches": self.batches,
+            "items": self.items,
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_depth_on_submit": self.queue_depths.snapshot()
+        }
+
+_batcher: Optional[MicroBatcher] = None
+
+def get_batcher() -> MicroBatcher:
+    """Get the shared micro-batcher in front of the diagnosis model."""
+    global _batcher
+    if _batcher is None:
+        _batcher = MicroBatcher(get_predictor().predict_batch)
+        register_collector("diagnosis_batcher", _batcher.stats)
+    return _batcher
@@ -1,76 +1,133 @@
-import joblib
-from pathlib import Path
 import numpy as np
-from typing import List, Dict, Tuple
+import threading
+from scipy.sparse import csr_matrix
+from typing import Any, List, Dict, Optional
+from models.engine import InferenceEngine, ModelBundle, Prediction, get_engine
+from .prediction_cache import PREDICTION_CACHE_SIZE, PredictionCache
+from ..metrics import register_collector
 
 class DiseasePredictor:
-    def __init__(self):
-        self.model = None
-        self.symptom_names = None
-        self.label_encoder = None
-        self.load_model()
-
-    def load_model(self):
-        """Load the trained model and necessary components."""
-        try:
-            model_path = Path("models/saved_models/disease_predictor.joblib")
-            symptom_path = Path("data/processed/symptom_names.joblib")
-            encoder_path = Path("data/processed/label_encoder.joblib")
-
-            self.model = joblib.load(model_path)
-            self.symptom_names = joblib.load(symptom_path)
-            self.label_encoder = joblib.load(encoder_path)
-        except Exception as e:
-            print(f"Error loading model: {str(e)}")
-            raise
-
-    def preprocess_symptoms(self, symptoms: List[str]) -> np.ndarray:
+    """
+    The API's view of the shared InferenceEngine.
+
+    Bundles, reloads, caching and the top-k path all live in the engine;
+    this adds what only the API needs, such as reloading in a background
+    thread, and keeps the interface the routes and batcher were written
+    against.
+    """
+
+    def __init__(self, engine: Optional[InferenceEngine] = None):
+        self.engine = engine or get_engine()
+        self._reload_thread: Optional[threading.Thread] = None
+
+    # Attributes of the current bundle, for callers that predate bundles
+    @property
+    def bundle(self) -> ModelBundle:
+        return self.engine.bundle
+
+    @property
+    def cache(self) -> Optional[PredictionCache]:
+        return self.engine.cache
+
+    @property
+    def model(self):
+        return self.engine.bundle.model
+
+    @property
+    def symptom_names(self) -> List[str]:
+        return self.engine.bundle.symptom_names
+
+    @property
+    def label_encoder(self):
+        return self.engine.bundle.label_encoder
+
+    @property
+    def classes_(self) -> np.ndarray:
+        return self.engine.bundle.classes_
+
+    @property
+    def version(self) -> str:
+        return self.engine.bundle.version
+
+    def reload(self) -> bool:
+        """
+        Load the artifacts from disk, validate them and swap them in.
+        Returns False if the files are unchanged; raises if the new version is invalid.
+        """
+        return self.engine.reload()
+
+    def reload_in_background(self) -> bool:
+        """Start a reload in a background thread; False if one is already running."""
+        if self._reload_thread is not None and self._reload_thread.is_alive():
+            return False
+
+        def run():
+            try:
+                self.reload()
+            except Exception:
+                pass  # Recorded in reload_state / reload_error
+
+        self._reload_thread = threading.Thread(target=run, name="model-reload", daemon=True)
+        self._reload_thread.start()
+        return True
+
+    def status(self) -> Dict[str, Any]:
+        return self.engine.status()
+
+    def symptom_indices(self, symptoms: List[str], bundle: Optional[ModelBundle] = None) -> np.ndarray:
+        return self.engine.symptom_indices(symptoms, bundle)
+
+    def preprocess_symptoms(self, symptoms: List[str]) -> csr_matrix:
         """Convert symptoms list to model input format."""
-        # Create a binary vector for symptoms
-        symptom_vector = np.zeros(len(self.symptom_names))
-        for symptom in symptoms:
-            if symptom in self.symptom_names:
-                idx = self.symptom_names.index(symptom)
-                symptom_vector[idx] = 1
-        return symptom_vector.reshape(1, -1)
-
-    def predict(self, symptoms: List[str]) -> Tuple[List[Dict[str, float]], str, float]:
+        return self.engine.preprocess_batch([symptoms])
+
+    def preprocess_batch(self, symptom_lists: List[List[str]], bundle: Optional[ModelBundle] = None) -> csr_matrix:
+        return self.engine.preprocess_batch(symptom_lists, bundle)
+
+    def top_k_indices(self, probabilities: np.ndarray) -> np.ndarray:
+        return self.engine.top_k_indices(probabilities)
+
+    def cached(self, symptoms: List[str]) -> Optional[Prediction]:
+        return self.engine.cached(symptoms)
+
+    def predict(self, symptoms: List[str]) -> Prediction:
         """
         Make predictions for given symptoms.
         Returns:
             - List of disease predictions with probabilities
             - Primary diagnosis
             - Confidence score
+            - Version of the model that served the prediction
         """
-        if not self.model or not self.symptom_names or not self.label_encoder:
-            raise RuntimeError("Model not loaded")
-
-        # Preprocess symptoms
-        X = self.preprocess_symptoms(symptoms)
-
-        # Get probability predictions
-        probabilities = self.model.predict_proba(X)[0]
+        return self.engine.predict(symptoms)
 
-        # Get top 3 predictions
-        top_indices = np.argsort(probabilities)[-3:][::-1]
-        predictions = []
-        for idx in top_indices:
-            disease = self.label_encoder.inverse_transform([idx])[0]
-            probability = float(probabilities[idx])
-            predictions.append({
-                "disease": disease,
-                "probability": probability
-            })
-
-        # Get primary diagnosis and confidence
-        primary_diagnosis = predictions[0]["disease"]
-        confidence = predictions[0]["probability"]
+    def predict_batch(self, symptom_lists: List[List[str]]) -> List[Prediction]:
+        """
+        Make predictions for several symptom lists with a single model call.
+        Returns one (predictions, primary diagnosis, confidence, model version)
+        tuple per input, in the same format as predict().
+        """
+        return self.engine.predict_batch(symptom_lists)
 
-        return predictions, primary_diagnosis, confidence
+    def predict_indices_batch(
+        self, index_sets: List[np.ndarray], bundle: Optional[ModelBundle] = None
+    ) -> List[Prediction]:
+        """Like predict_batch, for inputs already encoded as symptom index sets."""
+        return self.engine.predict_indices_batch(index_sets, bundle)
 
-# Create a singleton instance
-predictor = DiseasePredictor()
+_predictor: Optional[DiseasePredictor] = None
+_predictor_lock = threading.Lock()
 
 def get_predictor() -> DiseasePredictor:
-    """Get the singleton predictor instance."""
-    return predictor 
\ No newline at end of file
+    """Get the singleton predictor instance, loading the model on first use."""
+    global _predictor
+    if _predictor is None:
+        with _predictor_lock:
+            if _predictor is None:
+                _predictor = DiseasePredictor()
+                register_collector("model", _predictor.status)
+                if PREDICTION_CACHE_SIZE > 0:
+                    cache = PredictionCache(PREDICTION_CACHE_SIZE)
+                    _predictor.engine.set_cache(cache)
+                    register_collector("prediction_cache", cache.stats)
+    return _predictor
@@ -0,0 +1,79 @@
+import os
+import threading
+from typing import Optional, Tuple
+from models.registry import get_registry
+from .inference import DiseasePredictor, get_predictor
+
+# Seconds between checks of the artifact files; 0 disables watching
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "0"))
+
+class ModelWatcher:
+    """
+    Poll the model artifacts and reload the predictor when they change.
+
+    A change is acted on only once the files have looked the same for two
+    consecutive polls, so a model that is still being written is not loaded
+    half-way. Failed reloads leave the current model serving and are retried
+    when the files change again. Files that don't exist yet, such as a
+    backend's model that has not been exported, are watched for creation.
+    """
+
+    def __init__(self, predictor: DiseasePredictor, interval: float = MODEL_WATCH_INTERVAL):
+        self.predictor = predictor
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _signature(self) -> Tuple:
+        registry = get_registry()
+        signature = []
+        for name in self.predictor.engine.artifacts:
+            try:
+                stat = os.stat(registry.path(name))
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _run(self):
+        current = self._signature()
+        pending = None
+        while not self._stop.wait(self.interval):
+            signature = self._signature()
+            # A file that went missing is being replaced
+            replacing = any(new is None and old is not None for new, old in zip(signature, current))
+            if signature == current or replacing:
+                pending = None
+            elif signature != pending:
+                # Changed since the last poll; wait until it settles
+                pending = signature
+            else:
+                pending = None
+                try:
+                    self.predictor.reload()
+                except Exception:
+                    pass  # Recorded on the predictor
+                # The watched files follow the backend now served
+                current = self._signature()
+
+    def start(self):
+        if self.interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+_watcher: Optional[ModelWatcher] = None
+
+def get_model_watcher() -> ModelWatcher:
+    """Get the watcher for the shared predictor."""
+    global _watcher
+    if _watcher is None:
+        _watcher = ModelWatcher(get_predictor())
+    return _watcher
@@ -0,0 +1,113 @@
+import os
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Hashable, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "4096"))
+PREDICTION_CACHE_WARM_SETS = int(os.getenv("PREDICTION_CACHE_WARM_SETS", "0"))
+PREDICTION_CACHE_WARM_SCAN = int(os.getenv("PREDICTION_CACHE_WARM_SCAN", "50000"))
+
+class PredictionCache:
+    """
+    Bounded LRU cache of prediction results keyed by symptom index set
+    (models.engine.index_set_key).
+
+    Entries belong to the model version last passed to set_version().
+    Switching versions drops every entry, and lookups or stores tagged with
+    any other version miss or are ignored, so a request still finishing on
+    a replaced model can neither read nor repopulate the cache. Cached
+    results are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self.version: Optional[str] = None
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def set_version(self, version: str):
+        """Serve entries for this model version only, dropping any others."""
+        with self._lock:
+            if version == self.version:
+                return
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.version = version
+
+    def get(self, version: str, key: Hashable, record_miss: bool = True) -> Optional[Any]:
+        """Cached result for key, or None; record_miss=False for probes followed by a counted lookup."""
+        with self._lock:
+            result = self._entries.get(key) if version == self.version else None
+            if result is None:
+                if record_miss:
+                    self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, version: str, key: Hashable, result: Any):
+        with self._lock:
+            if version != self.version:
+                return
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+async def warm_prediction_cache(
+    predictor,
+    session_factory,
+    n_sets: int = PREDICTION_CACHE_WARM_SETS,
+    scan_rows: int = PREDICTION_CACHE_WARM_SCAN
+) -> int:
+    """
+    Pre-compute the n_sets most frequent symptom sets among the latest
+    scan_rows diagnoses. Returns the number of sets scored.
+    """
+    if n_sets <= 0 or predictor.cache is None:
+        return 0
+    from ..models.db_models import Diagnosis
+
+    async with session_factory() as db:
+        result = await db.execute(
+            select(Diagnosis.symptoms).order_by(Diagnosis.id.desc()).limit(scan_rows)
+        )
+        rows = result.scalars().all()
+
+    # Count canonical sets, so differently ordered lists are the same entry
+    counts = Counter(
+        frozenset(symptoms) for symptoms in rows if isinstance(symptoms, list)
+    )
+    top_sets = [sorted(symptoms) for symptoms, _ in counts.most_common(n_sets)]
+    if top_sets:
+        await run_in_threadpool(predictor.predict_batch, top_sets)
+    return len(top_sets)
@@ -7,14 +7,19 @@ class Message(BaseModel):
     content: str = Field(..., description="Content of the message")
     timestamp: datetime = Field(default_factory=datetime.now)
 
-class Conversation(BaseModel):
+class ConversationSummary(BaseModel):
     id: Optional[int] = None
     user_id: int
     title: str = Field(..., max_length=100)
-    messages: List[Message] = []
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
 
+    class Config:
+        orm_mode = True
+
+class Conversation(ConversationSummary):
+    messages: List[Message] = []
+
 class ConversationCreate(BaseModel):
     title: str = Field(..., max_length=100)
 
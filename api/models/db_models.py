@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Float, DateTime, JSON
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, Float, DateTime, JSON
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..database import Base
@@ -21,6 +21,10 @@ class User(Base):
 
 class Conversation(Base):
     __tablename__ = "conversations"
+    __table_args__ = (
+        # Backs keyset pagination of a user's conversations
+        Index("ix_conversations_user_created_id", "user_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -29,11 +33,14 @@ class Conversation(Base):
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
 
     user = relationship("User", back_populates="conversations")
-    messages = relationship("Message", back_populates="conversation")
+    messages = relationship("Message", back_populates="conversation", order_by="Message.id")
     diagnoses = relationship("Diagnosis", back_populates="conversation")
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        Index("ix_messages_conversation_id_id", "conversation_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     conversation_id = Column(Integer, ForeignKey("conversations.id"))
@@ -45,6 +52,10 @@ class Message(Base):
 
 class Diagnosis(Base):
     __tablename__ = "diagnoses"
+    __table_args__ = (
+        # Backs keyset pagination of a user's diagnosis history
+        Index("ix_diagnoses_user_created_id", "user_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -53,6 +64,7 @@ class Diagnosis(Base):
     predictions = Column(JSON)  # List of disease predictions with probabilities
     primary_diagnosis = Column(String)
     confidence = Column(Float)
+    model_version = Column(String, nullable=True)  # Model that produced the predictions
     created_at = Column(DateTime, default=datetime.now)
 
     user = relationship("User", back_populates="diagnoses")
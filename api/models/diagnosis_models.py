@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 from datetime import datetime
 
 class Symptom(BaseModel):
@@ -12,7 +12,7 @@ class Diagnosis(BaseModel):
     user_id: int
     conversation_id: Optional[int] = None
     symptoms: List[str]
-    predictions: List[Dict[str, float]]
+    predictions: List[Dict[str, Union[float, str]]]
     primary_diagnosis: str
     confidence: float
     created_at: datetime = Field(default_factory=datetime.now)
@@ -21,12 +21,16 @@ class DiagnosisCreate(BaseModel):
     symptoms: List[str] = Field(..., min_items=1)
     conversation_id: Optional[int] = None
 
+class DiagnosisBatchCreate(BaseModel):
+    items: List[DiagnosisCreate] = Field(..., min_items=1, max_items=1000)
+
 class DiagnosisResponse(BaseModel):
     id: int
     symptoms: List[str]
-    predictions: List[Dict[str, float]]
+    predictions: List[Dict[str, Union[float, str]]]
     primary_diagnosis: str
     confidence: float
+    model_version: Optional[str] = None
     created_at: datetime
 
     class Config:
@@ -37,10 +41,19 @@ class DiagnosisHistory(BaseModel):
     user_id: int
     conversation_id: Optional[int]
     symptoms: List[str]
-    predictions: List[Dict[str, float]]
+    predictions: List[Dict[str, Union[float, str]]]
     primary_diagnosis: str
     confidence: float
+    model_version: Optional[str] = None
     created_at: datetime
 
     class Config:
-        orm_mode = True 
\ No newline at end of file
+        orm_mode = True
+
+class ModelStatus(BaseModel):
+    version: str
+    backend: Optional[str] = None
+    loaded_at: datetime
+    reload_state: str
+    reload_error: Optional[str] = None
+    reloads: int
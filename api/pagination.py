@@ -0,0 +1,50 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, or_
+
+# Page sizes accepted by the history endpoints
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Response header carrying the cursor of the next page; absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """Encode the (created_at, id) of the last row on a page as an opaque cursor."""
+    raw = json.dumps([created_at.isoformat(), id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def paginate_newest_first(query, created_col, id_col, limit: int, cursor: Optional[str] = None):
+    """
+    Order a select newest first on (created_at, id) and resume after the cursor.
+    One extra row is fetched so set_next_cursor can tell whether a page follows.
+    """
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        query = query.where(or_(
+            created_col < created_at,
+            and_(created_col == created_at, id_col < id)
+        ))
+    return query.order_by(created_col.desc(), id_col.desc()).limit(limit + 1)
+
+def set_next_cursor(response: Response, rows: list, limit: int) -> list:
+    """Trim the look-ahead row and advertise the next page cursor, if any."""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last: Any = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+    return rows
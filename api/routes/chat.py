@@ -1,7 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from ..database import get_db
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import AsyncIterator, List, Optional
+from datetime import datetime
+import json
+from ..database import get_async_db, get_read_db, ReadSessionLocal
 from ..models.chat_models import (
     Conversation,
     ConversationCreate,
@@ -11,45 +17,105 @@ from ..models.chat_models import (
 )
 from ..models.db_models import Conversation as DBConversation, Message as DBMessage
 from ..auth.utils import get_current_active_user
-from ..models.db_models import User
+from ..auth.principal_cache import Principal
+from ..write_behind import WriteBehindFull, get_message_buffer
+from ..chat_sessions import conversation_turn, get_chatbot, get_conversation_state
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate_newest_first, set_next_cursor
 
 router = APIRouter()
 
+# Rows fetched per round trip when streaming message history
+MESSAGE_STREAM_BATCH_SIZE = 500
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+def _format_message(row, fmt: str) -> str:
+    line = json.dumps({
+        "id": row.id,
+        "role": row.role,
+        "content": row.content,
+        "timestamp": row.timestamp.isoformat() if row.timestamp else None
+    })
+    if fmt == "sse":
+        # The event id lets EventSource clients resume via Last-Event-ID
+        return f"id: {row.id}\nevent: message\ndata: {line}\n\n"
+    return line + "\n"
+
+async def _stream_messages(conversation_id: int, after_id: int, fmt: str) -> AsyncIterator[str]:
+    # The request-scoped session may be closed before the body is sent, so use our own
+    async with ReadSessionLocal() as db:
+        result = await db.stream(
+            select(DBMessage.id, DBMessage.role, DBMessage.content, DBMessage.timestamp)
+            .where(DBMessage.conversation_id == conversation_id, DBMessage.id > after_id)
+            .order_by(DBMessage.id)
+            .execution_options(yield_per=MESSAGE_STREAM_BATCH_SIZE)
+        )
+        async for rows in result.partitions():
+            yield "".join(_format_message(row, fmt) for row in rows)
+
 @router.post("/conversations", response_model=Conversation)
 async def create_conversation(
     conversation: ConversationCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     db_conversation = DBConversation(
         user_id=current_user.id,
-        title=conversation.title
+        title=conversation.title,
+        messages=[]
     )
     db.add(db_conversation)
-    db.commit()
-    db.refresh(db_conversation)
+    await db.commit()
     return db_conversation
 
-@router.get("/conversations", response_model=List[Conversation])
+# Summaries carry no messages key; exclude_unset keeps it out of the response
+@router.get("/conversations", response_model=List[Conversation], response_model_exclude_unset=True)
 async def get_conversations(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    include_messages: bool = False,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    conversations = db.query(DBConversation).filter(
-        DBConversation.user_id == current_user.id
-    ).all()
-    return conversations
+    """List conversations newest first; pass the X-Next-Cursor header back as `cursor` for the next page."""
+    if include_messages:
+        query = select(DBConversation).options(selectinload(DBConversation.messages))
+    else:
+        # Summaries are projected from the conversations table alone
+        query = select(
+            DBConversation.id,
+            DBConversation.user_id,
+            DBConversation.title,
+            DBConversation.created_at,
+            DBConversation.updated_at
+        )
+    query = paginate_newest_first(
+        query.where(DBConversation.user_id == current_user.id),
+        DBConversation.created_at, DBConversation.id, limit, cursor
+    )
+    result = await db.execute(query)
+    rows = result.scalars().all() if include_messages else result.all()
+    return set_next_cursor(response, rows, limit)
 
 @router.get("/conversations/{conversation_id}", response_model=Conversation)
 async def get_conversation(
     conversation_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    conversation = db.query(DBConversation).filter(
-        DBConversation.id == conversation_id,
-        DBConversation.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(DBConversation)
+        .options(selectinload(DBConversation.messages))
+        .where(
+            DBConversation.id == conversation_id,
+            DBConversation.user_id == current_user.id
+        )
+    )
+    conversation = result.scalars().first()
     if not conversation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -57,20 +123,55 @@ async def get_conversation(
         )
     return conversation
 
+@router.get("/conversations/{conversation_id}/messages")
+async def stream_conversation_messages(
+    conversation_id: int,
+    after_id: Optional[int] = Query(None, ge=0),
+    format: Optional[str] = Query(None, pattern="^(ndjson|sse)$"),
+    accept: Optional[str] = Header(None),
+    last_event_id: Optional[int] = Header(None),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Stream a conversation's messages oldest first as NDJSON or Server-Sent Events.
+    Pass the last received message id as `after_id` (or Last-Event-ID) to resume.
+    """
+    result = await db.execute(select(DBConversation.id).where(
+        DBConversation.id == conversation_id,
+        DBConversation.user_id == current_user.id
+    ))
+    if result.scalar() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found"
+        )
+    
+    if format is None:
+        format = "sse" if accept and "text/event-stream" in accept else "ndjson"
+    if after_id is None:
+        after_id = last_event_id or 0
+    return StreamingResponse(
+        _stream_messages(conversation_id, after_id, format),
+        media_type=STREAM_MEDIA_TYPES[format],
+        headers={"Cache-Control": "no-cache"}
+    )
+
 @router.post("/chat", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    # Get or create conversation
+    # Get or create conversation; the whole turn is committed once below
     conversation = None
     if request.conversation_id:
-        conversation = db.query(DBConversation).filter(
+        result = await db.execute(select(DBConversation.id).where(
             DBConversation.id == request.conversation_id,
             DBConversation.user_id == current_user.id
-        ).first()
-        if not conversation:
+        ))
+        conversation_id = result.scalar()
+        if conversation_id is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Conversation not found"
@@ -81,35 +182,49 @@ async def chat(
             title="New Conversation"
         )
         db.add(conversation)
-        db.commit()
-        db.refresh(conversation)
+        await db.flush()
+        conversation_id = conversation.id
 
-    # Save user message
-    user_message = DBMessage(
-        conversation_id=conversation.id,
-        role="user",
-        content=request.message
-    )
-    db.add(user_message)
-
-    # TODO: Process message with chatbot and get response
-    # This is where you'll integrate with your chatbot logic
+    # One shared chatbot engine; each conversation keeps its own small state.
+    # Turns of one conversation run one at a time, from loading its state to saving the messages.
     bot_response = "This is a placeholder response"
-    symptoms = []  # Extract symptoms from the conversation
-    diagnosis = None  # Get diagnosis if applicable
+    symptoms = []
+    diagnosis = None
+    chatbot = await get_chatbot()
+    async with conversation_turn(conversation_id):
+        if chatbot is not None:
+            state = await get_conversation_state(chatbot, db, conversation_id, is_new=conversation is not None)
+            response = await run_in_threadpool(chatbot.process_input, request.message, state)
+            bot_response = response['text']
+            symptoms = list(state.symptoms)
+            diagnosis = response.get('diagnosis')
 
-    # Save bot response
-    bot_message = DBMessage(
-        conversation_id=conversation.id,
-        role="assistant",
-        content=bot_response
-    )
-    db.add(bot_message)
-    db.commit()
+        # Save both messages in a single multi-row INSERT
+        now = datetime.now()
+        messages = [
+            {"conversation_id": conversation_id, "role": "user", "content": request.message, "timestamp": now},
+            {"conversation_id": conversation_id, "role": "assistant", "content": bot_response, "timestamp": now}
+        ]
+        message_buffer = get_message_buffer()
+        if message_buffer is not None:
+            if conversation is not None:
+                await db.commit()
+            try:
+                await message_buffer.enqueue(messages)
+            except WriteBehindFull:
+                # Not accepted, so a retry can't store the turn twice
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Chat storage is busy, please retry",
+                    headers={"Retry-After": "1"},
+                )
+        else:
+            await db.execute(insert(DBMessage).values(messages))
+            await db.commit()
 
     return ChatResponse(
         message=bot_response,
-        conversation_id=conversation.id,
+        conversation_id=conversation_id,
         symptoms=symptoms,
         diagnosis=diagnosis
     ) 
\ No newline at end of file
@@ -1,29 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from ..database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from ..database import get_async_db, get_read_db
 from ..models.diagnosis_models import (
     DiagnosisCreate,
+    DiagnosisBatchCreate,
     DiagnosisResponse,
-    DiagnosisHistory
+    DiagnosisHistory,
+    ModelStatus
 )
 from ..models.db_models import Diagnosis as DBDiagnosis
 from ..auth.utils import get_current_active_user
-from ..models.db_models import User
+from ..auth.principal_cache import Principal
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate_newest_first, set_next_cursor
 from ..ml.inference import get_predictor
+from ..ml.batching import get_batcher
 
 router = APIRouter()
 
 @router.post("/diagnose", response_model=DiagnosisResponse)
 async def create_diagnosis(
     diagnosis: DiagnosisCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
-        # Get predictions from ML model
-        predictor = get_predictor()
-        predictions, primary_diagnosis, confidence = predictor.predict(diagnosis.symptoms)
+        # Repeated symptom sets are answered from the cache; the rest are batched with concurrent requests
+        result = get_predictor().cached(diagnosis.symptoms)
+        if result is None:
+            result = await get_batcher().submit(diagnosis.symptoms)
+        predictions, primary_diagnosis, confidence, model_version = result
 
         # Create diagnosis record
         db_diagnosis = DBDiagnosis(
@@ -32,11 +40,12 @@ async def create_diagnosis(
             symptoms=diagnosis.symptoms,
             predictions=predictions,
             primary_diagnosis=primary_diagnosis,
-            confidence=confidence
+            confidence=confidence,
+            model_version=model_version
         )
         db.add(db_diagnosis)
-        db.commit()
-        db.refresh(db_diagnosis)
+        await db.commit()
+        await db.refresh(db_diagnosis)
         return db_diagnosis
     except Exception as e:
         raise HTTPException(
@@ -44,29 +53,97 @@ async def create_diagnosis(
             detail=f"Error making diagnosis: {str(e)}"
         )
 
+@router.post("/diagnose/batch", response_model=List[DiagnosisResponse])
+async def create_diagnosis_batch(
+    batch: DiagnosisBatchCreate,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        # Score every item with a single model call
+        predictor = get_predictor()
+        results = await run_in_threadpool(
+            predictor.predict_batch, [item.symptoms for item in batch.items]
+        )
+
+        # Create diagnosis records
+        db_diagnoses = [
+            DBDiagnosis(
+                user_id=current_user.id,
+                conversation_id=item.conversation_id,
+                symptoms=item.symptoms,
+                predictions=predictions,
+                primary_diagnosis=primary_diagnosis,
+                confidence=confidence,
+                model_version=model_version
+            )
+            for item, (predictions, primary_diagnosis, confidence, model_version) in zip(batch.items, results)
+        ]
+        db.add_all(db_diagnoses)
+        await db.commit()
+        return db_diagnoses
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error making diagnosis: {str(e)}"
+        )
+
 @router.get("/diagnoses", response_model=List[DiagnosisHistory])
 async def get_diagnosis_history(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    diagnoses = db.query(DBDiagnosis).filter(
-        DBDiagnosis.user_id == current_user.id
-    ).all()
-    return diagnoses
+    """List diagnoses newest first; pass the X-Next-Cursor header back as `cursor` for the next page."""
+    result = await db.execute(paginate_newest_first(
+        select(DBDiagnosis).where(DBDiagnosis.user_id == current_user.id),
+        DBDiagnosis.created_at, DBDiagnosis.id, limit, cursor
+    ))
+    return set_next_cursor(response, result.scalars().all(), limit)
 
 @router.get("/diagnoses/{diagnosis_id}", response_model=DiagnosisResponse)
 async def get_diagnosis(
     diagnosis_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    diagnosis = db.query(DBDiagnosis).filter(
+    result = await db.execute(select(DBDiagnosis).where(
         DBDiagnosis.id == diagnosis_id,
         DBDiagnosis.user_id == current_user.id
-    ).first()
+    ))
+    diagnosis = result.scalars().first()
     if not diagnosis:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Diagnosis not found"
         )
-    return diagnosis 
\ No newline at end of file
+    return diagnosis
+
+def _require_admin(current_user: Principal):
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+
+@router.get("/model", response_model=ModelStatus)
+async def get_model_status(
+    current_user: Principal = Depends(get_current_active_user)
+):
+    return get_predictor().status()
+
+@router.post("/model/reload", response_model=ModelStatus, status_code=status.HTTP_202_ACCEPTED)
+async def reload_model(
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Reload the model artifacts from disk in the background. The current
+    version keeps serving until the new one has passed a warm-up batch;
+    poll GET /model for the outcome.
+    """
+    _require_admin(current_user)
+    predictor = get_predictor()
+    predictor.reload_in_background()
+    return predictor.status()
@@ -0,0 +1,64 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+class SessionStore:
+    """
+    Bounded LRU store of conversation states with idle expiry.
+
+    Holds at most max_sessions states; the least recently used is evicted
+    first and a state untouched for ttl seconds is dropped. Callers rebuild
+    missing states from the conversation history, so eviction only trades
+    memory for recomputation.
+    """
+
+    def __init__(self, max_sessions: int = 10000, ttl: float = 1800):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: "OrderedDict[Hashable, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._sessions.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] <= time.monotonic():
+                del self._sessions[key]
+                self.misses += 1
+                return None
+            entry[0] = time.monotonic() + self.ttl
+            self._sessions.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, state: Any):
+        with self._lock:
+            self._sessions[key] = [time.monotonic() + self.ttl, state]
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._sessions.pop(key, None)
+            return entry[1] if entry else None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
@@ -0,0 +1,197 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from .database import AsyncSessionLocal
+from .metrics import Histogram, register_collector
+from .models.db_models import Message
+
+CHAT_WRITE_BEHIND = os.getenv("CHAT_WRITE_BEHIND", "false").lower() == "true"
+CHAT_WRITE_BEHIND_INTERVAL_MS = float(os.getenv("CHAT_WRITE_BEHIND_INTERVAL_MS", "5"))
+CHAT_WRITE_BEHIND_MAX_PENDING = int(os.getenv("CHAT_WRITE_BEHIND_MAX_PENDING", "5000"))
+CHAT_WRITE_BEHIND_MAX_RETRIES = int(os.getenv("CHAT_WRITE_BEHIND_MAX_RETRIES", "3"))
+CHAT_WRITE_BEHIND_ENQUEUE_TIMEOUT = float(os.getenv("CHAT_WRITE_BEHIND_ENQUEUE_TIMEOUT", "5"))
+
+class WriteBehindFull(Exception):
+    """Raised when rows could not be accepted because the buffer stayed full."""
+
+class WriteBehindBuffer:
+    """
+    Buffer row inserts in memory and write them in bulk.
+
+    A worker task flushes everything pending every interval_ms as one
+    multi-row INSERT in one transaction, so many chat turns share a single
+    commit. Rows are acknowledged before they are durable: if the process
+    dies, rows buffered since the last flush (at most about interval_ms of
+    traffic) are lost, and until a flush lands they are not visible to
+    readers. stop() flushes whatever is left, so a graceful shutdown loses
+    nothing.
+
+    A failed flush keeps its rows, ahead of newer ones, and is retried on
+    the next tick. After max_retries failures in a row the batch is written
+    one row per transaction instead: rows rejected by the database
+    (integrity or data errors, e.g. a message for a deleted conversation)
+    are dropped into dead_letters, the rest are written or, if the database
+    itself is failing, kept for the next attempt.
+
+    No more than max_pending rows are ever held, including a batch being
+    flushed. Once rows are accepted, enqueue() never raises: a full buffer
+    makes it wait for a flush before accepting, and raise WriteBehindFull
+    after enqueue_timeout seconds with its rows not accepted.
+    """
+
+    def __init__(
+        self,
+        model=Message,
+        interval_ms: float = CHAT_WRITE_BEHIND_INTERVAL_MS,
+        max_pending: int = CHAT_WRITE_BEHIND_MAX_PENDING,
+        session_factory=AsyncSessionLocal,
+        max_retries: int = CHAT_WRITE_BEHIND_MAX_RETRIES,
+        enqueue_timeout: float = CHAT_WRITE_BEHIND_ENQUEUE_TIMEOUT
+    ):
+        self.model = model
+        self.interval_ms = interval_ms
+        self.max_pending = max_pending
+        self.session_factory = session_factory
+        self.max_retries = max_retries
+        self.enqueue_timeout = enqueue_timeout
+        self._pending: List[Dict[str, Any]] = []
+        self._in_flight = 0
+        self._failures = 0
+        self._lock: Optional[asyncio.Lock] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.dead_letters: Deque[Tuple[Dict[str, Any], str]] = deque(maxlen=1000)
+        self.flush_sizes = Histogram([1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024])
+        self.flushes = 0
+        self.rows = 0
+        self.errors = 0
+        self.dropped = 0
+        self.full_waits = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def start(self):
+        """Start the flush task on the running event loop."""
+        if self._worker is not None and not self._worker.done():
+            return
+        self._lock = asyncio.Lock()
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush task and write out anything still buffered."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._pending:
+            await self.flush()
+
+    async def enqueue(self, rows: List[Dict[str, Any]]):
+        """Buffer rows for the next flush, waiting while the buffer is full."""
+        self.start()
+        deadline = None
+        while self.pending + self._in_flight + len(rows) > self.max_pending and self.pending + self._in_flight:
+            if deadline is None:
+                self.full_waits += 1
+                deadline = time.monotonic() + self.enqueue_timeout
+            elif time.monotonic() >= deadline:
+                raise WriteBehindFull(f"{self.pending + self._in_flight} rows still waiting to be written")
+            try:
+                await self.flush()
+            except Exception:
+                # Counted in errors; give the database a moment before trying again
+                await asyncio.sleep(min(self.interval_ms / 1000, max(deadline - time.monotonic(), 0)))
+        self._pending.extend(rows)
+
+    async def flush(self):
+        """Write every buffered row in a single transaction; raises if it could not."""
+        async with self._lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, []
+            self._in_flight = len(batch)
+            try:
+                await self._insert(batch)
+            except Exception as e:
+                self.errors += 1
+                self._failures += 1
+                print(f"Error flushing {len(batch)} buffered rows: {str(e)}")
+                if self._failures < self.max_retries:
+                    # Keep the rows, ahead of anything queued meanwhile, for the next attempt
+                    self._pending[:0] = batch
+                    raise
+                batch = await self._insert_one_by_one(batch)
+            finally:
+                self._in_flight = 0
+            self._failures = 0
+            if batch:
+                self.flushes += 1
+                self.rows += len(batch)
+                self.flush_sizes.observe(len(batch))
+
+    async def _insert(self, rows: List[Dict[str, Any]]):
+        async with self.session_factory() as db:
+            await db.execute(insert(self.model).values(rows))
+            await db.commit()
+
+    async def _insert_one_by_one(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Isolate the rows that keep a batch from being written. Returns the rows
+        written; rejected rows are dead-lettered and the rest are requeued.
+        """
+        written, retry = [], []
+        for row in batch:
+            try:
+                await self._insert([row])
+                written.append(row)
+            except (IntegrityError, DataError) as e:
+                self.dead_letters.append((row, str(e)))
+                self.dropped += 1
+                print(f"Dropping buffered row rejected by the database: {str(e)}")
+            except Exception:
+                retry.append(row)
+        if retry:
+            self._pending[:0] = retry
+            if not written:
+                raise RuntimeError(f"Database unavailable, {len(retry)} rows kept for retry")
+        return written
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_ms / 1000)
+            try:
+                await self.flush()
+            except Exception:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval_ms": self.interval_ms,
+            "pending": self.pending,
+            "flushes": self.flushes,
+            "rows": self.rows,
+            "errors": self.errors,
+            "dropped": self.dropped,
+            "full_waits": self.full_waits,
+            "flush_size": self.flush_sizes.snapshot()
+        }
+
+_message_buffer: Optional[WriteBehindBuffer] = None
+
+def get_message_buffer() -> Optional[WriteBehindBuffer]:
+    """Get the chat message write-behind buffer, or None when CHAT_WRITE_BEHIND is off."""
+    global _message_buffer
+    if not CHAT_WRITE_BEHIND:
+        return None
+    if _message_buffer is None:
+        _message_buffer = WriteBehindBuffer()
+        register_collector("chat_write_behind", _message_buffer.stats)
+    return _message_buffer
@@ -1,3 +1,3 @@
-from .main_chatbot import MedicalChatbot
+from .main_chatbot import MedicalChatbot, ConversationState
 
-__all__ = ['MedicalChatbot'] 
\ No newline at end of file
+__all__ = ['MedicalChatbot', 'ConversationState'] 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from pathlib import Path
 import json
 import sys
@@ -15,16 +15,31 @@ except ImportError:
     print("Warning: nlp module not found. Please ensure it's installed and in the Python path.")
     DiagnosisIntegrator = None
 
+class ConversationState:
+    """Per-conversation progress through the flow; small enough to keep thousands in memory"""
+    __slots__ = ('current_step', 'symptoms')
+
+    def __init__(self, current_step: str = 'greeting', symptoms: Optional[List[str]] = None):
+        self.current_step = current_step
+        self.symptoms = symptoms if symptoms is not None else []
+
+    def __repr__(self) -> str:
+        return f"ConversationState(current_step={self.current_step!r}, symptoms={self.symptoms!r})"
+
 class MedicalChatbot:
+    """
+    Conversation engine. The flow and the diagnosis integrator are shared;
+    everything specific to one conversation lives in a ConversationState, so
+    one instance can serve many users by passing their state to process_input.
+    """
+
     def __init__(self):
         if DiagnosisIntegrator is None:
             raise ImportError("Required module 'nlp' not found. Please install it first.")
             
         self.diagnosis_integrator = DiagnosisIntegrator()
-        self.conversation_state = {
-            'symptoms': [],
-            'current_step': 'greeting'
-        }
+        # State used when process_input is called without one (CLI, single user)
+        self.conversation_state = ConversationState()
         
         # Load conversation flow
         try:
@@ -37,35 +52,37 @@ class MedicalChatbot:
             print(f"Error loading conversation flow: {str(e)}")
             raise
 
-    def process_input(self, user_input: str) -> Dict[str, Any]:
-        """Process user input and return response"""
-        current_step = self.conversation_state['current_step']
+    def process_input(self, user_input: str, state: Optional[ConversationState] = None) -> Dict[str, Any]:
+        """Process user input, advancing the given conversation state in place, and return response"""
+        if state is None:
+            state = self.conversation_state
+        current_step = state.current_step
         
         if current_step == 'greeting':
-            self.conversation_state['current_step'] = 'symptom_collection'
+            state.current_step = 'symptom_collection'
             return {'text': self.flow['greeting']}
             
         elif current_step == 'symptom_collection':
             # Extract symptoms from user input
             extraction = self.diagnosis_integrator.text_to_features(user_input)
-            self.conversation_state['symptoms'].extend(extraction['exact_matches'])
+            state.symptoms.extend(extraction['exact_matches'])
             
-            if len(self.conversation_state['symptoms']) >= 3:
-                self.conversation_state['current_step'] = 'diagnosis'
+            if len(state.symptoms) >= 3:
+                state.current_step = 'diagnosis'
                 return {'text': self.flow['enough_symptoms']}
             else:
-                remaining = 3 - len(self.conversation_state['symptoms'])
+                remaining = 3 - len(state.symptoms)
                 return {'text': self.flow['more_symptoms_needed'].format(remaining=remaining)}
                 
         elif current_step == 'diagnosis':
-            diagnosis = self.diagnosis_integrator.predict_disease(
-                self.conversation_state['symptoms']
-            )
-            self.conversation_state['current_step'] = 'followup'
-            return {'text': self._format_diagnosis(diagnosis)}
+            diagnosis = self.diagnosis_integrator.predict_disease(state.symptoms)
+            state.current_step = 'followup'
+            return {'text': self._format_diagnosis(diagnosis), 'diagnosis': diagnosis}
             
         elif current_step == 'followup':
-            self.conversation_state = {'current_step': 'greeting'}  # Reset
+            # Reset
+            state.current_step = 'greeting'
+            state.symptoms = []
             return {'text': self.flow['goodbye']}
 
     def _format_diagnosis(self, diagnosis: Dict) -> str:
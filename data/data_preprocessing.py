@@ -3,8 +3,16 @@ from sklearn.preprocessing import LabelEncoder
 from sklearn.model_selection import train_test_split
 import joblib
 import yaml
+import sys
 from pathlib import Path
 
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from data.dataset import save_splits
+
 def load_config():
     with open(Path('config/model_config.yaml'), 'r') as f:
         return yaml.safe_load(f)
@@ -43,10 +51,13 @@ def preprocess_data():
     symptom_names = df.drop('prognosis', axis=1).columns.tolist()
     joblib.dump(symptom_names, processed_dir / 'symptom_names.joblib')
     
-    pd.DataFrame(X_train).to_csv(processed_dir / 'X_train.csv', index=False)
-    pd.DataFrame(X_test).to_csv(processed_dir / 'X_test.csv', index=False)
-    pd.DataFrame(y_train).to_csv(processed_dir / 'y_train.csv', index=False)
-    pd.DataFrame(y_test).to_csv(processed_dir / 'y_test.csv', index=False)
+    # Bit-packed, memory-mappable splits with a manifest
+    save_splits(
+        {'train': (X_train, y_train), 'test': (X_test, y_test)},
+        symptom_names,
+        le.classes_,
+        processed_dir
+    )
     
     joblib.dump(le, processed_dir / 'label_encoder.joblib')
     
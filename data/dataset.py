@@ -0,0 +1,117 @@
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+import numpy as np
+
+PROCESSED_DIR = Path('data/processed')
+MANIFEST_FILE = 'manifest.json'
+
+# Split files already checked against the manifest in this process, by path and checksum
+_verified: Set[Tuple[Path, str]] = set()
+_verified_lock = threading.Lock()
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def save_splits(splits: Dict[str, Tuple[np.ndarray, np.ndarray]], symptom_names: List[str],
+                classes: List[str], processed_dir: Path = PROCESSED_DIR):
+    """
+    Save 0/1 symptom matrices bit-packed as .npy files plus a JSON manifest
+    with the symptom names, label classes, shapes and checksums.
+    """
+    processed_dir = Path(processed_dir)
+    processed_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {
+        'format': 'packbits-v1',
+        'symptom_names': list(symptom_names),
+        'classes': [str(c) for c in classes],
+        'splits': {}
+    }
+    for name, (X, y) in splits.items():
+        X = np.asarray(X)
+        if not np.isin(X, (0, 1)).all():
+            raise ValueError(f"Split '{name}' is not a binary symptom matrix")
+        y = np.asarray(y).ravel()
+        y = y.astype(np.min_scalar_type(max(int(y.max(initial=0)), 0)))
+
+        x_path = processed_dir / f'X_{name}.npy'
+        y_path = processed_dir / f'y_{name}.npy'
+        np.save(x_path, np.packbits(X.astype(bool), axis=1))
+        np.save(y_path, y)
+        manifest['splits'][name] = {
+            'rows': int(X.shape[0]),
+            'features': int(X.shape[1]),
+            'X': x_path.name,
+            'y': y_path.name,
+            'X_sha256': _sha256(x_path),
+            'y_sha256': _sha256(y_path)
+        }
+    with open(processed_dir / MANIFEST_FILE, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def load_manifest(processed_dir: Path = PROCESSED_DIR) -> dict:
+    with open(Path(processed_dir) / MANIFEST_FILE) as f:
+        return json.load(f)
+
+def load_split(name: str, processed_dir: Path = PROCESSED_DIR,
+               unpack: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Memory-map a split. Returns (X, y) with X bit-packed (one bit per symptom,
+    see np.unpackbits), or unpacked into a uint8 0/1 matrix when unpack=True.
+    The files are checked against the manifest checksums on first load and
+    ValueError is raised if they don't match.
+    """
+    processed_dir = Path(processed_dir)
+    info = load_manifest(processed_dir)['splits'][name]
+    for key in ('X', 'y'):
+        _verify_file(processed_dir / info[key], info[f'{key}_sha256'])
+    X = np.load(processed_dir / info['X'], mmap_mode='r')
+    y = np.load(processed_dir / info['y'], mmap_mode='r')
+    if unpack:
+        X = np.unpackbits(X, axis=1, count=info['features'])
+    return X, y
+
+def _verify_file(path: Path, sha256: str):
+    key = (path.resolve(), sha256)
+    with _verified_lock:
+        if key in _verified:
+            return
+        if _sha256(path) != sha256:
+            raise ValueError(f"Checksum mismatch for {path}; re-run data preprocessing")
+        _verified.add(key)
+
+def verify_checksums(processed_dir: Path = PROCESSED_DIR) -> bool:
+    """Check every split file against the checksums in the manifest"""
+    processed_dir = Path(processed_dir)
+    for info in load_manifest(processed_dir)['splits'].values():
+        if _sha256(processed_dir / info['X']) != info['X_sha256']:
+            return False
+        if _sha256(processed_dir / info['y']) != info['y_sha256']:
+            return False
+    return True
+
+def convert_csv_splits(processed_dir: Path = PROCESSED_DIR):
+    """Convert CSV splits written by older versions of data_preprocessing.py"""
+    import joblib
+    import pandas as pd
+
+    processed_dir = Path(processed_dir)
+    splits = {
+        name: (pd.read_csv(processed_dir / f'X_{name}.csv').values,
+               pd.read_csv(processed_dir / f'y_{name}.csv').values.ravel())
+        for name in ('train', 'test')
+    }
+    symptom_names = joblib.load(processed_dir / 'symptom_names.joblib')
+    label_encoder = joblib.load(processed_dir / 'label_encoder.joblib')
+    save_splits(splits, symptom_names, label_encoder.classes_, processed_dir)
+    print(f"Converted CSV splits in {processed_dir} to bit-packed .npy files")
+
+if __name__ == '__main__':
+    convert_csv_splits()
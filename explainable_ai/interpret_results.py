@@ -1,13 +1,23 @@
 from collections import defaultdict
 import numpy as np
-import joblib
-from pathlib import Path
+from models.registry import get_artifact
 
 class ExplanationGenerator:
     def __init__(self):
         self.symptom_impact = defaultdict(list)
-        self.symptom_names = joblib.load(Path('data/processed/symptom_names.joblib'))
-        self.label_encoder = joblib.load(Path('data/processed/label_encoder.joblib'))
+
+    # Read from the registry on use, so a hot reload is picked up
+    @property
+    def model(self):
+        return get_artifact('disease_predictor')
+
+    @property
+    def symptom_names(self):
+        return get_artifact('symptom_names')
+
+    @property
+    def label_encoder(self):
+        return get_artifact('label_encoder')
         
     def generate_explanation(self, shap_values, symptom_vector):
         """Generate human-readable explanation from SHAP values"""
@@ -27,7 +37,7 @@ class ExplanationGenerator:
         contributing_symptoms.sort(key=lambda x: abs(x[1]), reverse=True)
         
         # Generate explanation
-        explanation = f"The model predicts {top_disease} with {pred_probs[top_disease_idx]:.2%} confidence.\n"
+        explanation = f"Primary diagnosis: {top_disease} ({pred_probs[top_disease_idx]:.2%} confidence).\n"
         explanation += "Key contributing symptoms:\n"
         for symptom, contribution in contributing_symptoms[:5]:  # Top 5 symptoms
             direction = "increases" if contribution > 0 else "decreases"
@@ -37,10 +47,11 @@ class ExplanationGenerator:
 
     def generate_contrastive_explanation(self, shap_values, top_diseases):
         """Explain why one disease was chosen over another"""
-        primary = top_diseases[0]
-        secondary = top_diseases[1]
+        primary = self.label_encoder.classes_[top_diseases[0]]
+        secondary = self.label_encoder.classes_[top_diseases[1]]
         
-        diff = shap_values[primary] - shap_values[secondary]
+        # One row per sample; the explanation is for a single vector
+        diff = shap_values[top_diseases[0]][0] - shap_values[top_diseases[1]][0]
         
         return (
             f"The system favored {primary} over {secondary} because:\n"
@@ -7,7 +7,7 @@ class XAIPipeline:
         self.shap = SHAPExplainer()
         self.interpreter = ExplanationGenerator()
     
-    def explain(self, symptom_vector):
+    def explain(self, symptom_vector, plot=False):
         # Get SHAP values
         shap_values = self.shap.explain_prediction(symptom_vector)
         
@@ -16,10 +16,15 @@ class XAIPipeline:
         top_class = np.argmax(pred_proba)
         
         # Generate explanations
-        return {
+        result = {
             'shap_values': shap_values,
             'text_explanation': self.interpreter.generate_explanation(
-                shap_values, symptom_vector, top_class),
+                shap_values, symptom_vector),
             'contrastive_explanation': self.interpreter.generate_contrastive_explanation(
                 shap_values, [top_class, np.argsort(pred_proba)[-2]])
-        }
\ No newline at end of file
+        }
+        
+        # Plots are rendered in the background only when asked for
+        if plot:
+            result['plots'] = self.shap.submit_plots(symptom_vector)
+        return result
\ No newline at end of file
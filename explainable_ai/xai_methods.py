@@ -1,76 +1,225 @@
 import shap
-import pandas as pd
 import numpy as np
-import joblib
 from pathlib import Path
 import matplotlib
 matplotlib.use('Agg')  # Non-interactive backend
 import matplotlib.pyplot as plt
+from functools import lru_cache
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, NamedTuple
+import hashlib
+import os
+import threading
+from data.dataset import load_split
+from models.engine import artifact_version
+from models.registry import get_artifact
+
+PLOTS_DIR = Path('docs/shap')
+
+class PlotJob(NamedTuple):
+    """Handle for an asynchronous plotting job"""
+    key: str
+    paths: Dict[str, Path]
+    future: Future
 
 class SHAPExplainer:
-    def __init__(self):
-        # Load model and data with absolute paths
-        self.model = joblib.load(Path('models/saved_models/disease_predictor.joblib').resolve())
-        self.symptom_names = joblib.load(Path('data/processed/symptom_names.joblib').resolve())
-        self.label_encoder = joblib.load(Path('data/processed/label_encoder.joblib').resolve())
+    def __init__(self, cache_size=1024, plot_workers=2):
+        # Model and metadata are shared with the rest of the process, and
+        # re-read from the registry so a hot reload reaches the explanations
+        self.cache_size = cache_size
+        self.background = None
+        self.model_version = None
+        self._explained_model = None
+        self._refresh_lock = threading.Lock()
+        self._refresh()
         
-        # Prepare background data
-        X_train = pd.read_csv(Path('data/processed/X_train.csv').resolve()).values
-        self.background = shap.utils.sample(X_train, 10)  # Updated sampling method
+        # Plotting is opt-in and runs in worker processes
+        self.plot_workers = plot_workers
+        self._plot_pool = None
+        self._plot_jobs = {}
+        self._plot_lock = threading.RLock()
 
-    def explain_prediction(self, symptom_vector):
-        """Generate SHAP explanations for a prediction"""
-        # Create explainer
-        explainer = shap.KernelExplainer(
-            self.model.predict_proba,
-            self.background,
-            link='logit'
-        )
-        
-        # Calculate SHAP values
-        X = np.array(symptom_vector).reshape(1, -1)
-        shap_values = explainer.shap_values(X)
-        
-        # Create proper Explanation object for each class
-        shap_exps = []
-        for i, values in enumerate(shap_values):
-            exp = shap.Explanation(
-                values=values,
-                base_values=explainer.expected_value[i],
-                data=X,
-                feature_names=self.symptom_names
+    @property
+    def model(self):
+        return get_artifact('disease_predictor')
+
+    @property
+    def symptom_names(self):
+        return get_artifact('symptom_names')
+
+    @property
+    def label_encoder(self):
+        return get_artifact('label_encoder')
+
+    def _refresh(self):
+        """Rebuild the explainer, and drop memoized values, once the shared model has been replaced"""
+        model = self.model
+        if model is self._explained_model:
+            return
+        with self._refresh_lock:
+            if model is self._explained_model:
+                return
+            explainer = self._build_explainer(model)
+            # Values are memoized per explainer, so none outlive the model they came from
+            self._cached_shap_values = lru_cache(maxsize=self.cache_size)(
+                lambda key, explainer=explainer: self._compute_shap_values(key, explainer)
+            )
+            self.explainer = explainer
+            # Content hash of the model files, so plots of different models never share a key
+            self.model_version = artifact_version()
+            self._explained_model = model
+
+    def _build_explainer(self, model):
+        """Use the exact, fast TreeExplainer for tree models, KernelExplainer otherwise"""
+        try:
+            # Tree SHAP values are in probability space for random forests
+            return shap.TreeExplainer(model)
+        except Exception:
+            # Prepare background data
+            X_train, _ = load_split('train', unpack=True)
+            self.background = shap.utils.sample(X_train, 10)  # Updated sampling method
+            return shap.KernelExplainer(
+                model.predict_proba,
+                self.background,
+                link='logit'
             )
-            shap_exps.append(exp)
+
+    def _cache_key(self, X):
+        """Symptom vectors are 0/1, so pack them into a short hashable key"""
+        if np.isin(X, (0, 1)).all():
+            return ('bits', np.packbits(X.ravel().astype(bool)).tobytes())
+        return ('raw', X.astype(np.float64).tobytes())
+
+    def _compute_shap_values(self, key, explainer):
+        kind, data = key
+        if kind == 'bits':
+            X = np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=len(self.symptom_names))
+        else:
+            X = np.frombuffer(data, dtype=np.float64)
+        X = X.astype(np.float64).reshape(1, -1)
+        shap_values = explainer.shap_values(X)
         
-        # Visualize
-        self._plot_shap(shap_exps)
+        # Newer shap returns (samples, features, classes); keep one array per class
+        if isinstance(shap_values, np.ndarray) and shap_values.ndim == 3:
+            shap_values = [shap_values[:, :, i] for i in range(shap_values.shape[2])]
+        expected_values = np.array(explainer.expected_value).ravel()
         
+        # Cached arrays are shared between callers, so make them read-only
+        for values in shap_values:
+            values.setflags(write=False)
+        expected_values.setflags(write=False)
+        return shap_values, expected_values
+
+    def shap_values(self, symptom_vector):
+        """Return (per-class SHAP values, expected values) for a symptom vector"""
+        self._refresh()
+        X = np.array(symptom_vector).reshape(1, -1)
+        return self._cached_shap_values(self._cache_key(X))
+
+    def cache_info(self):
+        return self._cached_shap_values.cache_info()
+
+    def explain_prediction(self, symptom_vector):
+        """Generate SHAP explanations for a prediction"""
+        shap_values, _ = self.shap_values(symptom_vector)
         return shap_values
 
-    def _plot_shap(self, shap_exps):
-        """Generate SHAP plots without GUI"""
+    def submit_plots(self, symptom_vector) -> PlotJob:
+        """
+        Render SHAP plots for a symptom vector in a background process.
+        Output goes to a directory named after the model version and the vector's
+        content, so repeated or concurrent requests for the same vector share one
+        job and one set of files.
+        """
+        self._refresh()
+        X = np.array(symptom_vector).reshape(1, -1)
+        key = hashlib.sha256(repr((self.model_version, self._cache_key(X))).encode()).hexdigest()[:16]
+        out_dir = (PLOTS_DIR / key).resolve()
+        paths = {'summary': out_dir / 'summary.png', 'waterfall': out_dir / 'waterfall.png'}
+
+        # Only claim the key under the lock; SHAP values are computed outside it
+        with self._plot_lock:
+            job = self._plot_jobs.get(key)
+            if job is not None:
+                return job
+            future = Future()
+            job = PlotJob(key, paths, future)
+            if all(path.exists() for path in paths.values()):
+                future.set_result(paths)
+                return job
+            self._plot_jobs[key] = job
+        future.add_done_callback(lambda _, key=key: self._forget_plot_job(key))
+
         try:
-            # Summary plot for each class
-            for i, exp in enumerate(shap_exps):
-                plt.figure(figsize=(10, 6))
-                shap.summary_plot(
-                    exp.values,
-                    features=exp.data,
-                    feature_names=self.symptom_names,
-                    plot_type='bar',
-                    show=False
+            shap_values, expected_values = self.shap_values(X)
+            pred_class = int(np.argmax(self.model.predict_proba(X)[0]))
+            with self._plot_lock:
+                if self._plot_pool is None:
+                    self._plot_pool = ProcessPoolExecutor(max_workers=self.plot_workers)
+                render = self._plot_pool.submit(
+                    _render_shap_plots,
+                    np.array(shap_values[pred_class][0]),
+                    float(expected_values[pred_class]),
+                    X[0].astype(float),
+                    list(self.symptom_names),
+                    str(self.label_encoder.classes_[pred_class]),
+                    paths
                 )
-                plt.title(f"SHAP Summary Plot for {self.label_encoder.classes_[i]}")
-                plt.tight_layout()
-                plt.savefig(Path('docs/shap_summary.png').resolve(), dpi=300)
-                plt.close()
-            
-            # Waterfall plot for top prediction
-            pred_class = np.argmax([exp.base_values for exp in shap_exps])
-            plt.figure(figsize=(12, 6))
-            shap.plots.waterfall(shap_exps[pred_class], show=False)
-            plt.savefig(Path('docs/shap_force.png').resolve(), dpi=300)
-            plt.close()
-            
         except Exception as e:
-            print(f"Visualization failed: {str(e)}")
\ No newline at end of file
+            future.set_exception(e)
+            return job
+        render.add_done_callback(lambda render: _copy_outcome(render, future))
+        return job
+
+    def _forget_plot_job(self, key):
+        with self._plot_lock:
+            self._plot_jobs.pop(key, None)
+
+    def close(self):
+        """Shut down the plotting worker processes"""
+        if self._plot_pool is not None:
+            self._plot_pool.shutdown(wait=True)
+            self._plot_pool = None
+
+def _copy_outcome(source: Future, target: Future):
+    if source.cancelled():
+        target.cancel()
+    elif source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
+
+def _save_figure(path: Path):
+    """Write to a temporary file first so readers never see a partial image"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.stem}.{os.getpid()}.tmp.png")
+    plt.savefig(tmp_path, dpi=300)
+    plt.close()
+    os.replace(tmp_path, path)
+
+def _render_shap_plots(values, base_value, data, feature_names, class_name, paths):
+    """Generate SHAP plots without GUI (runs in a worker process)"""
+    # Summary plot for the predicted class
+    plt.figure(figsize=(10, 6))
+    shap.summary_plot(
+        values.reshape(1, -1),
+        features=data.reshape(1, -1),
+        feature_names=feature_names,
+        plot_type='bar',
+        show=False
+    )
+    plt.title(f"SHAP Summary Plot for {class_name}")
+    plt.tight_layout()
+    _save_figure(paths['summary'])
+
+    # Waterfall plot for top prediction
+    explanation = shap.Explanation(
+        values=values,
+        base_values=base_value,
+        data=data,
+        feature_names=feature_names
+    )
+    plt.figure(figsize=(12, 6))
+    shap.plots.waterfall(explanation, show=False)
+    _save_figure(paths['waterfall'])
+    return paths
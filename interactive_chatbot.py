@@ -1,4 +1,4 @@
-from chatbot import MedicalChatbot
+from chatbot import MedicalChatbot, ConversationState
 import sys
 
 def run_interactive_chatbot():
@@ -25,10 +25,7 @@ def run_interactive_chatbot():
                 break
                 
             elif user_input.lower() == 'reset':
-                chatbot.conversation_state = {
-                    'symptoms': [],
-                    'current_step': 'greeting'
-                }
+                chatbot.conversation_state = ConversationState()
                 print("\nConversation reset. Starting new session...")
                 continue
             
@@ -38,9 +35,9 @@ def run_interactive_chatbot():
                 print("\nMedBot:", response['text'])
                 
                 # Show current symptoms if in symptom collection mode
-                if chatbot.conversation_state['current_step'] == 'symptom_collection':
-                    if chatbot.conversation_state['symptoms']:
-                        print("\nCurrent symptoms:", ", ".join(chatbot.conversation_state['symptoms']))
+                if chatbot.conversation_state.current_step == 'symptom_collection':
+                    if chatbot.conversation_state.symptoms:
+                        print("\nCurrent symptoms:", ", ".join(chatbot.conversation_state.symptoms))
                 
             except Exception as e:
                 print(f"\nError: {str(e)}")
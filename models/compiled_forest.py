@@ -0,0 +1,134 @@
+from typing import Optional
+import numpy as np
+from scipy.sparse import csr_matrix, issparse
+
+class CompiledForest:
+    """
+    A fitted sklearn forest flattened into contiguous numpy arrays.
+
+    All trees share one node table: `feature`, `threshold`, `children`
+    (left/right node ids) and `values` (per-leaf class probabilities,
+    already normalised). Leaves point to themselves, so a batch is scored
+    by advancing every (row, tree) pair one level per step for max_depth
+    steps, then averaging the leaf values, exactly like predict_proba.
+    Lookups go through flat np.take calls and the average is one sparse
+    (rows x nodes) product, so no (rows, trees, classes) array is built.
+
+    When every split threshold lies in [0, 1) - which is what training on
+    0/1 symptom vectors produces - the input is treated as boolean and the
+    branch taken is simply the feature bit, with no float comparison.
+
+    source_sha256 is the hash of the pickled forest it was compiled from, if
+    known, so a stale export is not paired with a retrained model.
+    """
+
+    # Class default for forests pickled before the attribute existed
+    source_sha256: Optional[str] = None
+
+    def __init__(self, feature, threshold, children, values, roots, max_depth, classes, n_features):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.values = values
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = classes
+        self.n_features_in_ = int(n_features)
+        self.binary = bool(np.all((threshold >= 0) & (threshold < 1)))
+
+    @classmethod
+    def from_sklearn(cls, forest, source_sha256: Optional[str] = None) -> "CompiledForest":
+        """Flatten a fitted RandomForestClassifier/ExtraTreesClassifier."""
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        if getattr(forest, 'n_outputs_', 1) != 1:
+            raise ValueError("Only single-output forests can be compiled")
+
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+        n_nodes = offsets[-1]
+        feature = np.zeros(n_nodes, dtype=np.int32)
+        threshold = np.zeros(n_nodes, dtype=np.float64)
+        children = np.zeros((n_nodes, 2), dtype=np.int32)
+        values = np.zeros((n_nodes, len(forest.classes_)), dtype=np.float64)
+
+        for tree, offset in zip(trees, offsets[:-1]):
+            nodes = slice(offset, offset + tree.node_count)
+            ids = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+            # Leaves loop back to themselves and test feature 0, which is harmless
+            feature[nodes] = np.where(is_leaf, 0, tree.feature)
+            threshold[nodes] = np.where(is_leaf, 0.0, tree.threshold)
+            children[nodes, 0] = offset + np.where(is_leaf, ids, tree.children_left)
+            children[nodes, 1] = offset + np.where(is_leaf, ids, tree.children_right)
+
+            leaf_values = tree.value[:, 0, :]
+            totals = leaf_values.sum(axis=1, keepdims=True)
+            totals[totals == 0] = 1
+            values[nodes] = leaf_values / totals
+
+        compiled = cls(
+            feature=feature,
+            threshold=threshold,
+            children=children,
+            values=values,
+            roots=offsets[:-1].astype(np.int32),
+            max_depth=max(tree.max_depth for tree in trees),
+            classes=np.asarray(forest.classes_),
+            n_features=forest.n_features_in_
+        )
+        compiled.source_sha256 = source_sha256
+        return compiled
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def predict_proba(self, X, chunk_size: int = 256) -> np.ndarray:
+        """
+        Class probabilities for a 2-D batch, averaged over all trees.
+        X may be dense or scipy sparse; sparse input is only densified one
+        chunk at a time.
+        """
+        if issparse(X):
+            X = csr_matrix(X)
+        else:
+            X = np.asarray(X)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected input of shape (n, {self.n_features_in_}), got {X.shape}")
+
+        proba = np.empty((X.shape[0], self.values.shape[1]), dtype=np.float64)
+        # Chunks keep the per-step working set in cache
+        for start in range(0, X.shape[0], chunk_size):
+            stop = min(start + chunk_size, X.shape[0])
+            chunk = X[start:stop]
+            if issparse(chunk):
+                chunk = chunk.toarray()
+            chunk = (chunk != 0).view(np.uint8) if self.binary else chunk.astype(np.float64)
+            proba[start:stop] = self._predict_chunk(chunk)
+        return proba
+
+    def _predict_chunk(self, X: np.ndarray) -> np.ndarray:
+        n_rows, n_trees = X.shape[0], self.n_trees
+        X = np.ascontiguousarray(X).ravel()
+
+        # One entry per (row, tree): where that row's features start, and its current node
+        offsets = np.repeat(np.arange(n_rows, dtype=np.intp) * self.n_features_in_, n_trees)
+        node = np.tile(self.roots.astype(np.intp), n_rows)
+        children = self.children.ravel()
+        for _ in range(self.max_depth):
+            x = np.take(X, offsets + np.take(self.feature, node))
+            branch = x if self.binary else (x > np.take(self.threshold, node))
+            node = np.take(children, 2 * node + branch)
+
+        # Mean of the reached leaves' values: row i sums nodes i*T..(i+1)*T-1, each weighted 1/T
+        leaves = csr_matrix(
+            (np.full(node.size, 1.0 / n_trees), node, np.arange(0, node.size + 1, n_trees)),
+            shape=(n_rows, len(self.values))
+        )
+        return (leaves @ self.values)
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def max_abs_diff(self, forest, X) -> float:
+        """Largest difference from the original forest's predict_proba on X."""
+        return float(np.max(np.abs(self.predict_proba(X) - forest.predict_proba(X))))
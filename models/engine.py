@@ -0,0 +1,414 @@
+import hashlib
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+import yaml
+from scipy.sparse import csr_matrix
+from models.registry import file_sha256, get_registry
+
+# Serving backend -> artifact holding its model
+MODEL_BACKENDS = {
+    "sklearn": "disease_predictor",
+    "compiled": "compiled_forest",
+    "onnx": "onnx_model",
+}
+
+# Artifacts that together make up one servable model version, besides the model itself
+BUNDLE_ARTIFACTS = ("symptom_names", "label_encoder")
+
+class StaleExportError(Exception):
+    """An exported model was not made from the sklearn model beside it."""
+
+def load_inference_config(path: Path = Path("config/model_config.yaml")) -> Dict[str, Any]:
+    """The `inference` section of the model config; INFERENCE_BACKEND and ONNX_INTRA_OP_THREADS override it."""
+    config = {"backend": "sklearn", "onnx_intra_op_threads": 1}
+    try:
+        with open(path, "r") as f:
+            config.update((yaml.safe_load(f) or {}).get("inference") or {})
+    except FileNotFoundError:
+        pass
+    config["backend"] = os.getenv("INFERENCE_BACKEND", config["backend"])
+    config["onnx_intra_op_threads"] = int(os.getenv("ONNX_INTRA_OP_THREADS", config["onnx_intra_op_threads"]))
+    if config["backend"] not in MODEL_BACKENDS:
+        raise ValueError(f"Unknown inference backend: {config['backend']}")
+    return config
+
+def bundle_artifacts(backend: str = "sklearn") -> Tuple[str, ...]:
+    """Every artifact a bundle served by this backend is built from."""
+    model = MODEL_BACKENDS[backend]
+    # Exported backends also carry the sklearn model they were exported from
+    source = () if model == MODEL_BACKENDS["sklearn"] else (MODEL_BACKENDS["sklearn"],)
+    return (model,) + source + BUNDLE_ARTIFACTS
+
+# (top-k predictions, primary diagnosis, confidence, model version)
+Prediction = Tuple[List[Dict[str, float]], str, float, str]
+
+class ModelBundle(NamedTuple):
+    """Immutable snapshot of everything needed to serve one model version"""
+    version: str
+    backend: str
+    model: Any
+    sklearn_model: Any  # The sklearn model itself, used by the explainers
+    symptom_names: List[str]
+    label_encoder: Any
+    symptom_index: Dict[str, int]
+    classes_: np.ndarray
+    accepts_sparse: bool
+    loaded_at: datetime
+
+def index_set_key(indices) -> bytes:
+    """Canonical key for a symptom index set: its sorted, unique int32 indices as bytes."""
+    return np.unique(np.asarray(indices, dtype=np.int32)).tobytes()
+
+def indices_to_csr(index_sets: List[np.ndarray], n_features: int) -> csr_matrix:
+    """One CSR row of ones per index set; size grows with the symptoms given, not the vocabulary."""
+    lengths = np.fromiter((len(indices) for indices in index_sets), dtype=np.int64, count=len(index_sets))
+    indptr = np.zeros(len(index_sets) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    indices = np.concatenate(index_sets).astype(np.int32) if index_sets else np.zeros(0, dtype=np.int32)
+    return csr_matrix(
+        (np.ones(len(indices)), indices, indptr),
+        shape=(len(index_sets), n_features)
+    )
+
+def accepts_sparse(model, n_features: int) -> bool:
+    """Whether predict_proba takes CSR input (e.g. an SVC fitted on dense data does not)."""
+    try:
+        model.predict_proba(csr_matrix((1, n_features)))
+        return True
+    except (TypeError, ValueError):
+        return False
+
+def top_k_indices(probabilities: np.ndarray, k: int) -> np.ndarray:
+    """Return the indices of the top-k classes per row, highest first."""
+    k = min(k, probabilities.shape[1])
+    # argpartition finds the top-k set, then only those k columns are sorted
+    top = np.argpartition(-probabilities, k - 1, axis=1)[:, :k]
+    top_proba = np.take_along_axis(probabilities, top, axis=1)
+    # Highest probability first; ties go to the higher class index, as argsort()[::-1] did
+    order = np.lexsort((-top, -top_proba), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+def artifact_version(names=bundle_artifacts()) -> str:
+    """Short content hash of the artifact files, used as the model version."""
+    digest = hashlib.sha256()
+    registry = get_registry()
+    for name in names:
+        with open(registry.path(name), "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+def load_bundle(
+    fresh: bool = False, backend: str = "sklearn", onnx_intra_op_threads: int = 1, attempts: int = 3
+) -> ModelBundle:
+    """
+    Build a bundle from the model registry. With fresh=True the files are read
+    again from disk, bypassing objects already shared through the registry.
+    Raises FileNotFoundError if the backend's model has not been exported.
+
+    The files are hashed before and after loading, so a model swapped in
+    mid-load can't be stamped with the previous version: the load is
+    retried from disk until both hashes agree.
+    """
+    artifacts = bundle_artifacts(backend)
+    # Shared copies read from files that have changed since would not match the hash
+    registry = get_registry()
+    if not all(registry.is_current(name) for name in artifacts):
+        fresh = True
+    for _ in range(attempts):
+        version = artifact_version(artifacts)
+        bundle = _load_bundle_files(version, fresh, backend, onnx_intra_op_threads)
+        if artifact_version(artifacts) == version:
+            return bundle
+        fresh = True
+    raise RuntimeError(f"Model artifacts kept changing while loading ({attempts} attempts)")
+
+def _load_bundle_files(version: str, fresh: bool, backend: str, onnx_intra_op_threads: int) -> ModelBundle:
+    registry = get_registry()
+    load = registry.load if fresh else registry.get
+    symptom_names, label_encoder = (load(name) for name in BUNDLE_ARTIFACTS)
+    if backend == "onnx":
+        # An onnxruntime session, not a joblib artifact, so it is not shared through the registry
+        from models.onnx_backend import load_onnx
+        model = load_onnx(
+            registry.path(MODEL_BACKENDS[backend]), onnx_intra_op_threads, label_encoder.classes_
+        )
+    else:
+        model = load(MODEL_BACKENDS[backend])
+    if backend != "sklearn":
+        # After a retrain whose export was skipped or failed, the export on disk is the old model
+        source = file_sha256(registry.path(MODEL_BACKENDS["sklearn"]))
+        if getattr(model, "source_sha256", None) != source:
+            raise StaleExportError(
+                f"{MODEL_BACKENDS[backend]} was not exported from the current {MODEL_BACKENDS['sklearn']}"
+            )
+    sklearn_model = model if backend == "sklearn" else load(MODEL_BACKENDS["sklearn"])
+    return ModelBundle(
+        version=version,
+        backend=backend,
+        model=model,
+        sklearn_model=sklearn_model,
+        symptom_names=symptom_names,
+        label_encoder=label_encoder,
+        # Precompute lookups used on every request
+        symptom_index={name: idx for idx, name in enumerate(symptom_names)},
+        classes_=np.asarray(label_encoder.classes_, dtype=object),
+        accepts_sparse=accepts_sparse(model, len(symptom_names)),
+        loaded_at=datetime.now()
+    )
+
+def validate_bundle(bundle: ModelBundle, warmup_size: int = 32):
+    """Run a warm-up batch through a bundle and raise ValueError if it is unusable."""
+    n_features = len(bundle.symptom_names)
+    if getattr(bundle.model, "n_features_in_", n_features) != n_features:
+        raise ValueError(
+            f"Model expects {bundle.model.n_features_in_} features, vocabulary has {n_features}"
+        )
+    if len(getattr(bundle.model, "classes_", bundle.classes_)) != len(bundle.classes_):
+        raise ValueError("Model classes do not match the label encoder")
+
+    # Empty input, single symptoms and a few random combinations
+    rng = np.random.default_rng(0)
+    X = np.zeros((warmup_size, n_features))
+    singles = min(warmup_size // 2 - 1, n_features)
+    X[np.arange(1, singles + 1), np.arange(singles)] = 1
+    X[warmup_size // 2:] = rng.random((warmup_size - warmup_size // 2, n_features)) < 0.05
+    probabilities = bundle.model.predict_proba(X)
+    if probabilities.shape != (warmup_size, len(bundle.classes_)):
+        raise ValueError(f"Unexpected prediction shape {probabilities.shape}")
+    if not np.all(np.isfinite(probabilities)) or not np.allclose(probabilities.sum(axis=1), 1):
+        raise ValueError("Model returned invalid probabilities")
+
+class InferenceEngine:
+    """
+    The one prediction path shared by the API and the offline predictor.
+
+    Serves from the current ModelBundle. Each call reads self.bundle once
+    and uses that snapshot throughout, so a reload can swap in a new bundle
+    at any time: in-flight calls finish on the version they started with
+    and report it with their results.
+
+    The model is served by the backend named in the `inference` section
+    of config/model_config.yaml: the pickled sklearn model, the compiled
+    forest, or an ONNX export run by onnxruntime. If that backend's model
+    has not been exported from the current sklearn model (or onnxruntime
+    is missing) it serves with sklearn meanwhile, and tries the configured
+    backend again on reload.
+
+    An optional cache (get/put/set_version, see api.ml.prediction_cache)
+    memoizes top-k results by symptom index set for the current version.
+    """
+
+    def __init__(self, top_k: int = 3, cache=None, config: Optional[Dict[str, Any]] = None):
+        self.top_k = top_k
+        self.cache = cache
+        self.config = config or load_inference_config()
+        self.backend = self.config["backend"]
+        self.bundle: Optional[ModelBundle] = None
+        self._reload_lock = threading.Lock()
+        self.reload_state = "idle"
+        self.reload_error: Optional[str] = None
+        self.reloads = 0
+        self.load()
+
+    def load(self):
+        """Load the bundle shared through the model registry."""
+        try:
+            self.bundle = self._load_bundle()
+        except Exception as e:
+            print(f"Error loading model: {str(e)}")
+            raise
+        self._set_cache_version()
+
+    def _load_bundle(self, fresh: bool = False) -> ModelBundle:
+        """Load with the configured backend, or with sklearn while it is unavailable."""
+        threads = self.config["onnx_intra_op_threads"]
+        try:
+            return load_bundle(fresh, self.backend, threads)
+        except (FileNotFoundError, ImportError, StaleExportError) as e:
+            if self.backend == "sklearn":
+                raise
+            print(f"Warning: {self.backend} backend unavailable, serving with sklearn: {str(e)}")
+            return load_bundle(fresh, "sklearn", threads)
+
+    @property
+    def artifacts(self) -> Tuple[str, ...]:
+        """
+        The artifact files to watch: those the served bundle is built from,
+        plus the configured backend's, so a later export is picked up.
+        """
+        names = bundle_artifacts(self.backend)
+        if self.bundle is not None:
+            names += tuple(name for name in bundle_artifacts(self.bundle.backend) if name not in names)
+        return names
+
+    def _unchanged(self) -> bool:
+        """Whether a reload would load the bundle already served."""
+        bundle = self.bundle
+        configured_model = get_registry().path(MODEL_BACKENDS[self.backend])
+        if bundle.backend != self.backend and Path(configured_model).exists():
+            return False  # The configured backend may be usable now
+        return artifact_version(bundle_artifacts(bundle.backend)) == bundle.version
+
+    def set_cache(self, cache):
+        """Put a prediction cache in front of the model (None removes it)."""
+        self.cache = cache
+        self._set_cache_version()
+
+    def _set_cache_version(self):
+        if self.cache is not None and self.bundle is not None:
+            self.cache.set_version(self.bundle.version)
+
+    def reload(self) -> bool:
+        """
+        Load the artifacts from disk, validate them and swap them in.
+        Returns False if the files are unchanged; raises if the new version is invalid.
+        """
+        with self._reload_lock:
+            self.reload_state = "loading"
+            try:
+                if self._unchanged():
+                    self.reload_state = "idle"
+                    return False
+                bundle = self._load_bundle(fresh=True)
+                if (bundle.backend, bundle.version) == (self.bundle.backend, self.bundle.version):
+                    # Fell back to the version already served
+                    self.reload_state = "idle"
+                    return False
+                validate_bundle(bundle)
+            except Exception as e:
+                self.reload_state = "failed"
+                self.reload_error = str(e)
+                print(f"Model reload failed, still serving {self.bundle.version}: {str(e)}")
+                raise
+
+            # Single reference assignment: new requests see the new bundle at once
+            self.bundle = bundle
+            self._set_cache_version()
+            # Publish the new version to the explainers and other registry users
+            registry = get_registry()
+            for name in BUNDLE_ARTIFACTS:
+                registry.put(name, getattr(bundle, name))
+            registry.put(MODEL_BACKENDS["sklearn"], bundle.sklearn_model)
+            if bundle.backend == "compiled":
+                registry.put(MODEL_BACKENDS["compiled"], bundle.model)
+            self.reloads += 1
+            self.reload_state = "idle"
+            self.reload_error = None
+            print(f"Model reloaded, now serving {bundle.version}")
+            return True
+
+    def status(self) -> Dict[str, Any]:
+        bundle = self.bundle
+        return {
+            "version": bundle.version,
+            "backend": bundle.backend,
+            "configured_backend": self.backend,
+            "loaded_at": bundle.loaded_at.isoformat(),
+            "reload_state": self.reload_state,
+            "reload_error": self.reload_error,
+            "reloads": self.reloads
+        }
+
+    def symptom_indices(self, symptoms: List[str], bundle: Optional[ModelBundle] = None) -> np.ndarray:
+        """Sorted, de-duplicated feature indices of the known symptoms in a list."""
+        bundle = bundle or self.bundle
+        index = bundle.symptom_index
+        return np.unique(np.fromiter((index[s] for s in symptoms if s in index), dtype=np.int32))
+
+    def preprocess_batch(self, symptom_lists: List[List[str]], bundle: Optional[ModelBundle] = None) -> csr_matrix:
+        """Convert several symptom lists into one sparse binary feature matrix."""
+        bundle = bundle or self.bundle
+        index_sets = [self.symptom_indices(symptoms, bundle) for symptoms in symptom_lists]
+        return indices_to_csr(index_sets, len(bundle.symptom_names))
+
+    def predict_proba_indices(self, index_sets: List[np.ndarray], bundle: Optional[ModelBundle] = None) -> np.ndarray:
+        """Full class probabilities, one row per symptom index set."""
+        bundle = bundle or self.bundle
+        # Sparse rows for models that take them, dense only where required
+        X = indices_to_csr(index_sets, len(bundle.symptom_names))
+        if not bundle.accepts_sparse:
+            X = X.toarray()
+        return bundle.model.predict_proba(X)
+
+    def top_k_indices(self, probabilities: np.ndarray, k: Optional[int] = None) -> np.ndarray:
+        return top_k_indices(probabilities, self.top_k if k is None else k)
+
+    def cached(self, symptoms: List[str]) -> Optional[Prediction]:
+        """The cached prediction for a symptom list, or None without calling the model."""
+        bundle = self.bundle
+        if self.cache is None or bundle is None:
+            return None
+        # A miss is counted when the prediction itself is made
+        return self.cache.get(
+            bundle.version, index_set_key(self.symptom_indices(symptoms, bundle)), record_miss=False
+        )
+
+    def predict(self, symptoms: List[str]) -> Prediction:
+        """Top-k prediction for one symptom list."""
+        return self.predict_batch([symptoms])[0]
+
+    def predict_batch(self, symptom_lists: List[List[str]]) -> List[Prediction]:
+        """Top-k predictions for several symptom lists with a single model call."""
+        # One snapshot for the whole batch, even if a reload swaps bundles meanwhile
+        bundle = self.bundle
+        if bundle is None:
+            raise RuntimeError("Model not loaded")
+        index_sets = [self.symptom_indices(symptoms, bundle) for symptoms in symptom_lists]
+        return self.predict_indices_batch(index_sets, bundle)
+
+    def predict_indices_batch(
+        self, index_sets: List[np.ndarray], bundle: Optional[ModelBundle] = None
+    ) -> List[Prediction]:
+        """Like predict_batch, for inputs already encoded as symptom index sets."""
+        bundle = bundle or self.bundle
+        if bundle is None:
+            raise RuntimeError("Model not loaded")
+        if not index_sets:
+            return []
+        if self.cache is None:
+            return self._score(index_sets, bundle)
+
+        # Only rows missing from the cache go to the model
+        keys = [index_set_key(indices) for indices in index_sets]
+        results = [self.cache.get(bundle.version, key) for key in keys]
+        missing = [row for row, result in enumerate(results) if result is None]
+        if missing:
+            scored = self._score([index_sets[row] for row in missing], bundle)
+            for row, result in zip(missing, scored):
+                results[row] = result
+                self.cache.put(bundle.version, keys[row], result)
+        return results
+
+    def _score(self, index_sets: List[np.ndarray], bundle: ModelBundle) -> List[Prediction]:
+        probabilities = self.predict_proba_indices(index_sets, bundle)
+        top_indices = self.top_k_indices(probabilities)
+        top_probabilities = np.take_along_axis(probabilities, top_indices, axis=1)
+        top_diseases = bundle.classes_[top_indices]
+
+        results = []
+        for diseases, probs in zip(top_diseases, top_probabilities):
+            predictions = [
+                {"disease": str(disease), "probability": float(probability)}
+                for disease, probability in zip(diseases, probs)
+            ]
+            results.append((
+                predictions, predictions[0]["disease"], predictions[0]["probability"], bundle.version
+            ))
+        return results
+
+_engine: Optional[InferenceEngine] = None
+_engine_lock = threading.Lock()
+
+def get_engine() -> InferenceEngine:
+    """Get the process-wide engine, loading the model on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = InferenceEngine()
+    return _engine
@@ -1,13 +1,23 @@
-import joblib
 import numpy as np
-from pathlib import Path
+from models.engine import InferenceEngine, get_engine
 
 class DiseasePredictor:
-    def __init__(self):
-        # Load model, encoder, and symptom names
-        self.model = joblib.load(Path('models/saved_models/disease_predictor.joblib'))
-        self.le = joblib.load(Path('data/processed/label_encoder.joblib'))
-        self.symptom_names = joblib.load(Path('data/processed/symptom_names.joblib'))
+    """Full-ranking predictions over the shared InferenceEngine (same model, same hot path as the API)."""
+
+    def __init__(self, engine: InferenceEngine = None):
+        self.engine = engine or get_engine()
+
+    @property
+    def model(self):
+        return self.engine.bundle.model
+
+    @property
+    def le(self):
+        return self.engine.bundle.label_encoder
+
+    @property
+    def symptom_names(self):
+        return self.engine.bundle.symptom_names
         
     def predict_from_symptoms(self, symptom_list):
         """
@@ -19,10 +29,31 @@ class DiseasePredictor:
         Returns:
             dict: Prediction results
         """
-        # Create binary vector
-        input_vector = [1 if symptom in symptom_list else 0 
-                       for symptom in self.symptom_names]
-        return self.predict(input_vector)
+        return self.predict_indices(self.engine.symptom_indices(symptom_list))
+    
+    def predict_indices(self, indices):
+        """
+        Predict from the feature indices of the present symptoms
+        
+        Args:
+            indices: Iterable of positions in symptom_names
+            
+        Returns:
+            dict: Prediction results, as for predict()
+        """
+        bundle = self.engine.bundle
+        indices = np.unique(np.asarray(list(indices), dtype=np.int32))
+        probabilities = self.engine.predict_proba_indices([indices], bundle)
+        # Every class, ranked by the engine's top-k path
+        ranking = self.engine.top_k_indices(probabilities, k=len(bundle.classes_))[0]
+        probabilities = probabilities[0]
+        
+        return {
+            'disease': bundle.classes_[ranking[0]],
+            'probability': probabilities[ranking[0]],
+            'all_predictions': [(bundle.classes_[i], probabilities[i]) for i in ranking],
+            'matched_symptoms': [bundle.symptom_names[i] for i in indices]
+        }
     
     def predict(self, symptoms):
         """
@@ -39,30 +70,10 @@ class DiseasePredictor:
                 'matched_symptoms': list of matched symptom names
             }
         """
-        symptoms = np.array(symptoms)
-        if len(symptoms.shape) == 1:
-            symptoms = symptoms.reshape(1, -1)
-            
-        probabilities = self.model.predict_proba(symptoms)[0]
-        top_class_idx = np.argmax(probabilities)
-        
-        # Get matched symptoms
-        matched_symptoms = [self.symptom_names[i] 
-                          for i, val in enumerate(symptoms[0]) 
-                          if val == 1]
-        
-        all_predictions = sorted(
-            zip(self.le.classes_, probabilities),
-            key=lambda x: x[1],
-            reverse=True
-        )
-        
-        return {
-            'disease': self.le.classes_[top_class_idx],
-            'probability': probabilities[top_class_idx],
-            'all_predictions': all_predictions,
-            'matched_symptoms': matched_symptoms
-        }
+        symptoms = np.asarray(symptoms)
+        if len(symptoms.shape) == 2:
+            symptoms = symptoms[0]
+        return self.predict_indices(np.flatnonzero(symptoms == 1))
 
 if __name__ == '__main__':
     # Example usage
@@ -0,0 +1,80 @@
+from pathlib import Path
+from typing import Optional, Union
+import numpy as np
+from scipy.sparse import issparse
+
+# skl2onnx, onnxmltools and onnxruntime are optional; see requirements-onnx.txt
+
+def export_onnx(model, n_features: int, path: Union[str, Path], source_sha256: Optional[str] = None) -> Path:
+    """
+    Convert a fitted classifier to ONNX with a plain (n, n_classes) probability output.
+    Scikit-learn models go through skl2onnx, XGBoost through onnxmltools.
+    source_sha256, the hash of the pickled model, is kept in the ONNX metadata.
+    Raises ImportError if the converter for the model is not installed.
+    """
+    if type(model).__name__ == 'XGBClassifier':
+        from onnxmltools import convert_xgboost
+        from onnxmltools.convert.common.data_types import FloatTensorType
+        onnx_model = convert_xgboost(model, initial_types=[('input', FloatTensorType([None, n_features]))])
+    else:
+        from skl2onnx import to_onnx
+        # zipmap=False: probabilities as a tensor rather than a list of dicts
+        onnx_model = to_onnx(
+            model, np.zeros((1, n_features), dtype=np.float32),
+            options={id(model): {'zipmap': False}}
+        )
+    if source_sha256 is not None:
+        entry = onnx_model.metadata_props.add()
+        entry.key, entry.value = 'source_sha256', source_sha256
+    path = Path(path)
+    path.write_bytes(onnx_model.SerializeToString())
+    return path
+
+class OnnxModel:
+    """
+    An exported classifier served by onnxruntime on the CPU, with the
+    predict_proba interface the inference engine expects.
+
+    intra_op_threads sets the threads one call may use (0 lets onnxruntime
+    decide). The API already runs batches from a thread pool, so one
+    thread per call avoids oversubscribing the cores.
+    """
+
+    def __init__(self, path: Union[str, Path], intra_op_threads: int = 1, classes=None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(str(path), options, providers=['CPUExecutionProvider'])
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.n_features_in_ = int(model_input.shape[1])
+        # Outputs are (label, probabilities)
+        self.output_name = self.session.get_outputs()[-1].name
+        # Hash of the model it was exported from; None for older exports
+        self.source_sha256 = self.session.get_modelmeta().custom_metadata_map.get('source_sha256')
+        if classes is not None:
+            self.classes_ = np.asarray(classes)
+
+    def predict_proba(self, X) -> np.ndarray:
+        X = X.toarray() if issparse(X) else np.asarray(X)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected input of shape (n, {self.n_features_in_}), got {X.shape}")
+        probabilities = self.session.run(
+            [self.output_name], {self.input_name: X.astype(np.float32)}
+        )[0]
+        return probabilities.astype(np.float64)
+
+    def predict(self, X) -> np.ndarray:
+        indices = np.argmax(self.predict_proba(X), axis=1)
+        return self.classes_[indices] if hasattr(self, 'classes_') else indices
+
+def load_onnx(path: Union[str, Path], intra_op_threads: int = 1, classes: Optional[np.ndarray] = None) -> OnnxModel:
+    """Open an exported model; FileNotFoundError if it has not been exported."""
+    if not Path(path).exists():
+        raise FileNotFoundError(f"No ONNX model at {path}")
+    return OnnxModel(path, intra_op_threads=intra_op_threads, classes=classes)
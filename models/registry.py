@@ -0,0 +1,116 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+import joblib
+
+# Artifacts shared by the API, the chatbot and the explainers, by name
+ARTIFACT_PATHS = {
+    'disease_predictor': Path('models/saved_models/disease_predictor.joblib'),
+    'compiled_forest': Path('models/saved_models/disease_predictor_compiled.joblib'),
+    # Opened with onnxruntime (models.onnx_backend), never through get()
+    'onnx_model': Path('models/saved_models/disease_predictor.onnx'),
+    'symptom_names': Path('data/processed/symptom_names.joblib'),
+    'label_encoder': Path('data/processed/label_encoder.joblib'),
+    'symptom_patterns': Path('data/processed/symptom_patterns.joblib'),
+}
+
+def file_sha256(path: Union[str, Path]) -> str:
+    """Hex sha256 of a file's contents, e.g. to record which model an export was made from."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ModelRegistry:
+    """
+    Load each artifact once, on first use, and hand the same object to every caller.
+
+    Artifacts are loaded with joblib's mmap_mode so that plain numpy arrays
+    stored in them are mapped read-only from the page cache, and every worker
+    process reading the same file shares those pages. Objects that rebuild
+    their own buffers when unpickled (e.g. sklearn trees) are still copied.
+    Shared artifacts must be treated as read-only.
+    """
+
+    def __init__(self, paths: Optional[Dict[str, Path]] = None, mmap_mode: Optional[str] = 'r'):
+        self.paths = dict(ARTIFACT_PATHS if paths is None else paths)
+        self.mmap_mode = mmap_mode
+        self._artifacts: Dict[str, Any] = {}
+        # (mtime_ns, size) of each file when its cached copy was read
+        self._stats: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, path: Union[str, Path]):
+        """Add or repoint an artifact; a previously loaded copy is dropped."""
+        with self._lock:
+            self.paths[name] = Path(path)
+            self._artifacts.pop(name, None)
+
+    def path(self, name: str) -> Path:
+        try:
+            return self.paths[name]
+        except KeyError:
+            raise KeyError(f"Unknown artifact: {name}")
+
+    def get(self, name: str) -> Any:
+        """Return the artifact, loading it on first use; concurrent first calls load it once."""
+        try:
+            return self._artifacts[name]
+        except KeyError:
+            pass
+        path = self.path(name)
+        with self._lock:
+            lock = self._locks.setdefault(name, threading.Lock())
+        # Per-artifact lock so a slow model load doesn't hold up other artifacts
+        with lock:
+            if name not in self._artifacts:
+                # Stat first: a file replaced during the load then reads as changed
+                self._stats[name] = self._stat(name)
+                self._artifacts[name] = joblib.load(path, mmap_mode=self.mmap_mode)
+            return self._artifacts[name]
+
+    def _stat(self, name: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path(name))
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def is_current(self, name: str) -> bool:
+        """False if the cached copy was read from a file that has since changed."""
+        return name not in self._artifacts or self._stats.get(name) == self._stat(name)
+
+    def load(self, name: str) -> Any:
+        """Read the artifact from disk without caching it, e.g. to validate a new version."""
+        return joblib.load(self.path(name), mmap_mode=self.mmap_mode)
+
+    def put(self, name: str, artifact: Any):
+        """Publish an already loaded artifact, read from the current file, to later get() callers."""
+        with self._lock:
+            self._artifacts[name] = artifact
+            self._stats[name] = self._stat(name)
+
+    def loaded(self) -> List[str]:
+        return list(self._artifacts)
+
+    def clear(self, name: Optional[str] = None):
+        """Forget loaded artifacts so the next get() reloads them from disk."""
+        with self._lock:
+            if name is None:
+                self._artifacts.clear()
+            else:
+                self._artifacts.pop(name, None)
+
+_registry = ModelRegistry()
+
+def get_registry() -> ModelRegistry:
+    """Get the process-wide model registry."""
+    return _registry
+
+def get_artifact(name: str) -> Any:
+    """Shortcut for get_registry().get(name)."""
+    return _registry.get(name)
@@ -7,13 +7,20 @@ import seaborn as sns
 from pathlib import Path
 import numpy as np
 from sklearn.metrics import top_k_accuracy_score
+import sys
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from data.dataset import load_split
 
 def load_model_and_data():
     model_path = Path('models/saved_models/disease_predictor.joblib')
     model = joblib.load(model_path)
     
-    X_test = pd.read_csv(Path('data/processed/X_test.csv')).values
-    y_test = pd.read_csv(Path('data/processed/y_test.csv')).values.ravel()
+    X_test, y_test = load_split('test', unpack=True)
     
     le = joblib.load(Path('data/processed/label_encoder.joblib'))
     
@@ -1,5 +1,5 @@
-import pandas as pd
 import joblib
+import os
 import yaml
 from pathlib import Path
 from sklearn.ensemble import RandomForestClassifier
@@ -7,18 +7,28 @@ from sklearn.metrics import accuracy_score, classification_report
 from xgboost import XGBClassifier
 from sklearn.svm import SVC
 import numpy as np
+import sys
 from sklearn.utils.class_weight import compute_class_weight
 
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from data.dataset import load_split
+from models.compiled_forest import CompiledForest
+from models.onnx_backend import export_onnx, load_onnx
+from models.registry import file_sha256
+
+SAVED_MODELS_DIR = Path('models/saved_models')
+
 def load_config():
     with open(Path('config/model_config.yaml'), 'r') as f:
         return yaml.safe_load(f)
 
 def load_data():
-    processed_dir = Path('data/processed')
-    X_train = pd.read_csv(processed_dir / 'X_train.csv').values
-    X_test = pd.read_csv(processed_dir / 'X_test.csv').values
-    y_train = pd.read_csv(processed_dir / 'y_train.csv').values.ravel()
-    y_test = pd.read_csv(processed_dir / 'y_test.csv').values.ravel()
+    X_train, y_train = load_split('train', unpack=True)
+    X_test, y_test = load_split('test', unpack=True)
     return X_train, X_test, y_train, y_test
 
 def train_model(X_train, y_train):
@@ -74,17 +84,86 @@ def evaluate_model(model, X_test, y_test):
     
     return accuracy, y_proba
 
+def _staging_path(path):
+    """Where a file is written before os.replace() moves it into place in one step"""
+    return path.with_name(f".{path.name}.tmp")
+
+def _publish(path):
+    os.replace(_staging_path(path), path)
+
+def _remove_export(path):
+    """Delete an export left by an earlier model, so it is never paired with the new one"""
+    path.unlink(missing_ok=True)
+    _staging_path(path).unlink(missing_ok=True)
+
 def save_model(model):
-    saved_models_dir = Path('models/saved_models')
-    saved_models_dir.mkdir(exist_ok=True)
-    joblib.dump(model, saved_models_dir / 'disease_predictor.joblib')
+    """
+    Write the model to a staging file; publish_model() moves it into place.
+    Returns its sha256, which exports record as their source.
+    """
+    SAVED_MODELS_DIR.mkdir(exist_ok=True)
+    staged = _staging_path(SAVED_MODELS_DIR / 'disease_predictor.joblib')
+    joblib.dump(model, staged)
+    return file_sha256(staged)
+
+def publish_model():
+    _publish(SAVED_MODELS_DIR / 'disease_predictor.joblib')
     print("Model saved successfully!")
 
+def export_compiled_model(model, X_test, source_sha256, tolerance=1e-9):
+    """Flatten a random forest into arrays for fast inference; other models are skipped."""
+    path = SAVED_MODELS_DIR / 'disease_predictor_compiled.joblib'
+    if not isinstance(model, RandomForestClassifier):
+        print(f"Skipping compiled export: not supported for {type(model).__name__}")
+        _remove_export(path)
+        return None
+    compiled = CompiledForest.from_sklearn(model, source_sha256)
+    diff = compiled.max_abs_diff(model, X_test)
+    if diff > tolerance:
+        _remove_export(path)
+        raise ValueError(f"Compiled model differs from predict_proba by {diff:.2e}")
+    # Uncompressed so the registry can memory-map the node arrays
+    joblib.dump(compiled, _staging_path(path))
+    _publish(path)
+    print(f"Compiled model saved ({compiled.n_trees} trees, max |diff| {diff:.1e})")
+    return compiled
+
+def export_onnx_model(model, X_test, source_sha256, tolerance=1e-5):
+    """Export to ONNX for the onnxruntime backend; skipped if the converter isn't installed."""
+    config = load_config().get('inference', {})
+    path = SAVED_MODELS_DIR / 'disease_predictor.onnx'
+    if not config.get('export_onnx', True):
+        _remove_export(path)
+        return None
+    staged = _staging_path(path)
+    try:
+        export_onnx(model, X_test.shape[1], staged, source_sha256)
+        onnx_model = load_onnx(staged, config.get('onnx_intra_op_threads', 1))
+    except ImportError as e:
+        print(f"Skipping ONNX export: {str(e)} (see requirements-onnx.txt)")
+        _remove_export(path)
+        return None
+    # onnxruntime computes in float32, hence the looser tolerance
+    diff = np.max(np.abs(onnx_model.predict_proba(X_test) - model.predict_proba(X_test)))
+    if diff > tolerance:
+        _remove_export(path)
+        raise ValueError(f"ONNX model differs from predict_proba by {diff:.2e}")
+    _publish(path)
+    print(f"ONNX model saved (max |diff| {diff:.1e})")
+    return path
+
 def main():
     X_train, X_test, y_train, y_test = load_data()
     model = train_model(X_train, y_train)
     accuracy, y_proba = evaluate_model(model, X_test, y_test)
-    save_model(model)
+    # Exports go in first: until the model replaces the old one they don't
+    # match it, so the API never serves a mix of old and new files
+    source_sha256 = save_model(model)
+    try:
+        export_compiled_model(model, X_test, source_sha256)
+        export_onnx_model(model, X_test, source_sha256)
+    finally:
+        publish_model()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
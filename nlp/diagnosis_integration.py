@@ -2,7 +2,9 @@ from explainable_ai.pipeline import XAIPipeline
 import joblib
 from pathlib import Path
 import numpy as np
+from scipy.sparse import csr_matrix
 from .symptom_extraction import ComprehensiveSymptomExtractor
+from .keyword_matcher import KeywordMatcher
 
 class DiagnosisIntegrator:
     def __init__(self):
@@ -35,25 +37,12 @@ class DiagnosisIntegrator:
             'congestion': ['congestion', 'stuffy nose', 'nasal congestion']
         }
         
-    def text_to_features(self, text: str) -> dict:
-        """Extract symptoms from text"""
-        text = text.lower()
-        exact_matches = []
+        # Compile every variation into one automaton-style matcher
+        self.keyword_matcher = KeywordMatcher(self.symptom_mapping)
+        self.symptom_rank = {symptom: i for i, symptom in enumerate(self.symptom_mapping)}
         
-        # Check for each symptom and its variations
-        for symptom, variations in self.symptom_mapping.items():
-            if any(variation in text for variation in variations):
-                exact_matches.append(symptom)
-        
-        return {
-            'exact_matches': exact_matches,
-            'text': text
-        }
-    
-    def predict_disease(self, symptoms: list) -> dict:
-        """Predict disease based on symptoms"""
         # Define symptom patterns for different diseases
-        disease_patterns = {
+        self.disease_patterns = {
             'Common Cold': ['cough', 'sore throat', 'runny nose', 'sneezing', 'congestion'],
             'Influenza': ['fever', 'cough', 'body aches', 'fatigue', 'headache'],
             'Gastroenteritis': ['nausea', 'vomiting', 'diarrhea', 'stomach pain', 'loss of appetite'],
@@ -63,24 +52,78 @@ class DiagnosisIntegrator:
             'Pneumonia': ['cough', 'fever', 'breathing difficulty', 'chest pain', 'fatigue'],
             'Allergic Rhinitis': ['sneezing', 'runny nose', 'congestion', 'itchy eyes']
         }
+        self._build_incidence_matrix()
+        
+    def _build_incidence_matrix(self):
+        """Precompute the sparse disease x symptom matrix used for scoring"""
+        self.diseases = np.array(list(self.disease_patterns), dtype=object)
+        self.pattern_index = {}
+        rows, cols = [], []
+        for row, pattern in enumerate(self.disease_patterns.values()):
+            for symptom in dict.fromkeys(pattern):
+                rows.append(row)
+                cols.append(self.pattern_index.setdefault(symptom, len(self.pattern_index)))
+        self.incidence = csr_matrix(
+            (np.ones(len(rows)), (rows, cols)),
+            shape=(len(self.diseases), len(self.pattern_index))
+        )
+        # Scores are normalised by pattern length
+        self.pattern_lengths = np.array(
+            [len(pattern) for pattern in self.disease_patterns.values()], dtype=float
+        )
         
-        # Calculate match scores for each disease
-        predictions = []
-        for disease, pattern in disease_patterns.items():
-            # Count matching symptoms
-            matches = sum(1 for symptom in symptoms if symptom in pattern)
-            # Calculate probability (simple scoring)
-            probability = matches / len(pattern)
-            predictions.append((disease, probability))
+    def text_to_features(self, text: str) -> dict:
+        """Extract symptoms from text"""
+        text = text.lower()
         
-        # Sort by probability
-        predictions.sort(key=lambda x: x[1], reverse=True)
+        # Single pass over the text, matching whole words only
+        matches = self.keyword_matcher.find(text)
+        found = {match.keyword for match in matches}
+        exact_matches = sorted(found, key=self.symptom_rank.get)
         
         return {
-            'predictions': predictions[:5],  # Top 5 predictions
-            'symptoms_used': symptoms
+            'exact_matches': exact_matches,
+            'spans': [
+                {'start': m.start, 'end': m.end, 'text': m.text, 'symptom': m.keyword}
+                for m in matches
+            ],
+            'text': text
         }
     
+    def predict_disease(self, symptoms: list) -> dict:
+        """Predict disease based on symptoms"""
+        return self.predict_disease_batch([symptoms])[0]
+    
+    def predict_disease_batch(self, symptom_lists: list, top_k: int = 5) -> list:
+        """Predict diseases for many symptom lists with one sparse matrix product"""
+        # One row of symptom counts per input; unknown symptoms are ignored
+        rows, cols = [], []
+        for row, symptoms in enumerate(symptom_lists):
+            for symptom in symptoms:
+                col = self.pattern_index.get(symptom)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+        X = csr_matrix(
+            (np.ones(len(rows)), (rows, cols)),
+            shape=(len(symptom_lists), len(self.pattern_index))
+        )
+        
+        # Calculate match scores for every disease at once
+        scores = (X @ self.incidence.T).toarray() / self.pattern_lengths
+        
+        # Stable sort keeps pattern order between equal scores; with only a
+        # handful of diseases a full sort is as cheap as argpartition
+        top = np.argsort(-scores, axis=1, kind='stable')[:, :top_k]
+        
+        return [
+            {
+                'predictions': [(self.diseases[idx], float(score[idx])) for idx in indices],
+                'symptoms_used': symptoms
+            }
+            for symptoms, score, indices in zip(symptom_lists, scores, top)
+        ]
+    
     def predict_with_explanation(text):
         """Enhanced prediction with explainable AI"""
         integrator = DiagnosisIntegrator()
@@ -1,43 +1,68 @@
 import pandas as pd
+import numpy as np
 import joblib
+import hashlib
 from pathlib import Path
-from collections import defaultdict
+from typing import Dict, List, Optional
 import spacy
-from spacy.tokens import DocBin
+from spacy.tokens import Doc
 
-# Initialize NLP processor
-nlp = spacy.load("en_core_web_sm")
+PATTERNS_PATH = Path('data/processed/symptom_patterns.joblib')
+MATCHER_PATH = Path('data/processed/symptom_matcher.joblib')
+NEGATION_PHRASES = ["no", "not", "without", "don't have"]
+MIN_CO_OCCURRENCE = 5
+TOP_CO_OCCURRENCES = 3
 
-def generate_comprehensive_patterns():
+def co_occurrence_counts(csv_path: Path, chunksize: Optional[int] = None):
+    """
+    Count how often every pair of symptoms is reported together as X.T @ X over
+    the binary symptom matrix. With chunksize the CSV is streamed in pieces,
+    so datasets larger than memory only cost one chunk at a time.
+    """
+    chunks = pd.read_csv(csv_path, chunksize=chunksize) if chunksize else [pd.read_csv(csv_path)]
+    symptom_columns, counts = None, None
+    for chunk in chunks:
+        if symptom_columns is None:
+            # Get all symptom column names (excluding prognosis)
+            symptom_columns = [col for col in chunk.columns if col != "prognosis"]
+            counts = np.zeros((len(symptom_columns), len(symptom_columns)), dtype=np.int64)
+        X = (chunk[symptom_columns].to_numpy() == 1).astype(np.float64)
+        counts += np.rint(X.T @ X).astype(np.int64)
+    return symptom_columns, counts
+
+def top_co_occurrences(counts: np.ndarray, k: int = TOP_CO_OCCURRENCES,
+                       min_count: int = MIN_CO_OCCURRENCE) -> List[List[int]]:
+    """Per symptom, the indices of its k most frequent partners seen more than min_count times"""
+    counts = counts.astype(np.int64)
+    np.fill_diagonal(counts, -1)  # a symptom is not its own partner
+    k = min(k, counts.shape[1])
+    if k == 0:
+        return [[] for _ in range(counts.shape[0])]
+    # Rank by count, breaking ties in column order, so the top-k set is deterministic
+    n = counts.shape[1]
+    rank = counts * n + (n - 1 - np.arange(n))
+    top = np.argpartition(-rank, k - 1, axis=1)[:, :k]
+    top = np.take_along_axis(top, np.argsort(-np.take_along_axis(rank, top, axis=1), axis=1), axis=1)
+    top_counts = np.take_along_axis(counts, top, axis=1)
+    return [row[row_counts > min_count].tolist() for row, row_counts in zip(top, top_counts)]
+
+def generate_comprehensive_patterns(csv_path: Path = Path('data/raw/symptoms.csv'),
+                                   chunksize: Optional[int] = None):
     """Create symptom patterns from raw dataset"""
-    # Load your binary encoded dataset
-    df = pd.read_csv(Path('data/raw/symptoms.csv'))
-    
-    # Get all symptom column names (excluding prognosis)
-    symptom_columns = [col for col in df.columns if col != "prognosis"]
-    
-    # Create symptom clusters by co-occurrence
-    symptom_clusters = defaultdict(list)
-    for _, row in df.iterrows():
-        active_symptoms = [col for col in symptom_columns if row[col] == 1]
-        for symptom in active_symptoms:
-            symptom_clusters[symptom].extend(active_symptoms)
+    # Count symptom co-occurrences in your binary encoded dataset
+    symptom_columns, counts = co_occurrence_counts(csv_path, chunksize)
+    frequent = top_co_occurrences(counts)
     
     # Generate patterns for each symptom
     patterns = {}
-    for symptom in symptom_columns:
+    for idx, symptom in enumerate(symptom_columns):
         # Standard pattern
         readable = symptom.replace('_', ' ')
         patterns[symptom] = [readable]
         
-        # Add common co-occurring symptoms as context patterns
-        frequent_co_occurrences = [
-            s for s in symptom_clusters[symptom] 
-            if symptom_clusters[symptom].count(s) > 5
-        ][:3]  # Top 3 most frequent
-        
-        # Create phrase patterns
-        for co_symptom in frequent_co_occurrences:
+        # Add the top 3 most frequent co-occurring symptoms as context patterns
+        for co_idx in frequent[idx]:
+            co_symptom = symptom_columns[co_idx]
             phrase = f"{readable} and {co_symptom.replace('_', ' ')}"
             patterns[symptom].append(phrase)
     
@@ -62,8 +87,49 @@ def generate_comprehensive_patterns():
     # ===== END OF ADDITIONS =====
     
     # Save comprehensive patterns
-    joblib.dump(patterns, Path('data/processed/symptom_patterns.joblib'))
+    joblib.dump(patterns, PATTERNS_PATH)
     print(f"Generated {len(patterns)} symptom patterns with contextual variations")
 
+def matcher_artifact_key(nlp, patterns_path: Path = PATTERNS_PATH) -> str:
+    """Content hash identifying the pattern file and tokenizer a matcher was built from"""
+    digest = hashlib.sha256(Path(patterns_path).read_bytes())
+    digest.update("\n".join(NEGATION_PHRASES).encode("utf-8"))
+    digest.update(f"{nlp.meta.get('name')}-{nlp.meta.get('version')}-{spacy.__version__}".encode("utf-8"))
+    return digest.hexdigest()
+
+def make_pattern_docs(nlp, patterns: Dict[str, List[str]]) -> Dict[str, list]:
+    """Tokenize every pattern variant; PhraseMatcher on LOWER needs nothing more"""
+    docs = {symptom: [nlp.make_doc(text) for text in variants]
+            for symptom, variants in patterns.items()}
+    docs["NEGATION"] = [nlp.make_doc(phrase) for phrase in NEGATION_PHRASES]
+    return docs
+
+def save_matcher_artifact(docs: Dict[str, list], key: str, path: Path = MATCHER_PATH):
+    """Persist the tokenized patterns together with their content hash"""
+    # Token sequences are all a LOWER PhraseMatcher needs, and rebuilding Docs
+    # from words skips the tokenizer (and is much faster than DocBin.get_docs)
+    tokens = {label: [([t.text for t in doc], [bool(t.whitespace_) for t in doc])
+                      for doc in label_docs]
+              for label, label_docs in docs.items()}
+    joblib.dump({"key": key, "tokens": tokens}, path)
+
+def load_matcher_artifact(nlp, key: str, path: Path = MATCHER_PATH) -> Optional[Dict[str, list]]:
+    """Load pattern docs, or None if the artifact is missing or built from other patterns"""
+    if not Path(path).exists():
+        return None
+    artifact = joblib.load(path)
+    if artifact.get("key") != key:
+        return None
+    return {label: [Doc(nlp.vocab, words=words, spaces=spaces) for words, spaces in sequences]
+            for label, sequences in artifact["tokens"].items()}
+
+def build_matcher_artifact(nlp=None):
+    """Compile the symptom matcher patterns once and persist them for fast startup"""
+    nlp = nlp or spacy.load("en_core_web_sm")
+    patterns = joblib.load(PATTERNS_PATH)
+    save_matcher_artifact(make_pattern_docs(nlp, patterns), matcher_artifact_key(nlp))
+    print(f"Saved compiled symptom matcher to {MATCHER_PATH}")
+
 if __name__ == "__main__":
-    generate_comprehensive_patterns()
\ No newline at end of file
+    generate_comprehensive_patterns()
+    build_matcher_artifact()
\ No newline at end of file
@@ -0,0 +1,64 @@
+import re
+from typing import Dict, List, NamedTuple
+
+class KeywordMatch(NamedTuple):
+    start: int
+    end: int
+    text: str
+    keyword: str
+
+class KeywordMatcher:
+    """
+    Find many keywords in one linear pass over the text.
+
+    All variations are compiled into a single regular expression shaped like a
+    trie, so matching cost depends on the text length and the longest keyword
+    rather than on the number of keywords. Matches respect word boundaries
+    ("sweat" does not match inside "sweater"), prefer the longest variation at
+    a position, and tolerate any run of whitespace between words.
+    """
+
+    def __init__(self, keyword_map: Dict[str, List[str]]):
+        # Normalised variation -> canonical keyword; the first mapping wins
+        self.lookup = {}
+        for keyword, variations in keyword_map.items():
+            for variation in variations:
+                self.lookup.setdefault(self._normalise(variation), keyword)
+        self.pattern = re.compile(r"\b(?:" + _trie_pattern(self.lookup) + r")\b") \
+            if self.lookup else None
+
+    @staticmethod
+    def _normalise(text: str) -> str:
+        return " ".join(text.lower().split())
+
+    def find(self, text: str) -> List[KeywordMatch]:
+        """Return non-overlapping matches, left to right"""
+        if self.pattern is None:
+            return []
+        return [
+            KeywordMatch(m.start(), m.end(), m.group(), self.lookup[self._normalise(m.group())])
+            for m in self.pattern.finditer(text.lower())
+        ]
+
+def _trie_pattern(words) -> str:
+    """Build a regex alternation for the given words that branches like a trie"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    return _node_pattern(trie)
+
+def _node_pattern(node: dict) -> str:
+    branches = [
+        (r"\s+" if char == " " else re.escape(char)) + _node_pattern(child)
+        for char, child in sorted(node.items()) if char
+    ]
+    if not branches:
+        return ""
+    pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if "" in node:
+        # A word ends here; the greedy '?' still tries the longer words first
+        return f"(?:{pattern})?" if len(branches) == 1 else pattern + "?"
+    return pattern
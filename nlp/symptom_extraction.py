@@ -1,35 +1,60 @@
 import spacy
 from spacy.matcher import PhraseMatcher
-import joblib
-from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Iterable, Iterator
+from models.registry import get_artifact
+from .generate_patterns_from_data import (
+    matcher_artifact_key,
+    make_pattern_docs,
+    save_matcher_artifact,
+    load_matcher_artifact
+)
 
 class ComprehensiveSymptomExtractor:
     def __init__(self):
         self.nlp = spacy.load("en_core_web_sm")
-        self.symptom_map = joblib.load(Path('data/processed/symptom_names.joblib'))
-        self.patterns = joblib.load(Path('data/processed/symptom_patterns.joblib'))
+        self.symptom_map = get_artifact('symptom_names')
+        self.patterns = get_artifact('symptom_patterns')
         self.matcher = self._build_matcher()
         
     def _build_matcher(self):
         """Build matcher with multiple pattern types"""
         matcher = PhraseMatcher(self.nlp.vocab, attr="LOWER")
         
-        # Add main symptom patterns
-        for symptom, variants in self.patterns.items():
-            patterns = [self.nlp(text) for text in variants]
-            matcher.add(symptom, patterns)
-            
-        # Add negation patterns
-        negation_phrases = ["no", "not", "without", "don't have"]
-        for phrase in negation_phrases:
-            matcher.add("NEGATION", [self.nlp(phrase)])
+        # Reuse the compiled artifact unless the pattern file has changed
+        key = matcher_artifact_key(self.nlp)
+        docs = load_matcher_artifact(self.nlp, key)
+        if docs is None:
+            docs = make_pattern_docs(self.nlp, self.patterns)
+            try:
+                save_matcher_artifact(docs, key)
+            except OSError as e:
+                print(f"Could not save compiled symptom matcher: {str(e)}")
+        
+        # Add main symptom patterns and negation patterns
+        for label, patterns in docs.items():
+            matcher.add(label, patterns)
             
         return matcher
     
     def extract(self, text: str) -> Dict[str, List]:
         """Extract symptoms with context awareness"""
-        doc = self.nlp(text.lower())
+        return self._extract_doc(self.nlp(text.lower()))
+    
+    def extract_many(self, texts: Iterable[str], batch_size: int = 1000,
+                     n_process: int = 1) -> Iterator[Dict[str, List]]:
+        """Lazily extract symptoms from many texts, same output as extract()"""
+        # Matching only looks at tokens, so every pipeline component is skipped
+        docs = self.nlp.pipe(
+            (text.lower() for text in texts),
+            batch_size=batch_size,
+            n_process=n_process,
+            disable=self.nlp.pipe_names
+        )
+        for doc in docs:
+            yield self._extract_doc(doc)
+    
+    def _extract_doc(self, doc) -> Dict[str, List]:
+        """Match symptoms and negations in an already tokenized document"""
         matches = self.matcher(doc)
         
         results = {
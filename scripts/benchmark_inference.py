@@ -0,0 +1,88 @@
+"""
+Compare disease model inference backends on the test split.
+
+For each backend this reports the largest deviation from sklearn's
+predict_proba, single-row latency (p50/p95) and batch throughput.
+
+    python scripts/benchmark_inference.py --batch-size 32 --repeats 50
+
+The onnx backend needs requirements-onnx.txt.
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the project root directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+from data.dataset import load_split
+from models.compiled_forest import CompiledForest
+from models.engine import load_inference_config
+from models.onnx_backend import export_onnx, load_onnx
+from models.registry import get_artifact, get_registry
+
+def load_compiled(model):
+    if get_registry().path('compiled_forest').exists():
+        return get_artifact('compiled_forest')
+    print("No exported compiled model found, compiling in memory")
+    return CompiledForest.from_sklearn(model)
+
+def load_onnx_backend(model):
+    threads = load_inference_config()['onnx_intra_op_threads']
+    path = get_registry().path('onnx_model')
+    if not path.exists():
+        print("No exported ONNX model found, exporting to a temporary file")
+        path = export_onnx(model, model.n_features_in_, Path(tempfile.mkdtemp()) / 'disease_predictor.onnx')
+    return load_onnx(path, intra_op_threads=threads)
+
+# name -> loader taking the fitted sklearn model
+BACKENDS = {
+    'sklearn': lambda model: model,
+    'compiled': load_compiled,
+    'onnx': load_onnx_backend,
+}
+
+def single_row_latency(backend, X, rows: int):
+    timings = []
+    for i in range(rows):
+        row = X[i % len(X)][None, :]
+        start = time.perf_counter()
+        backend.predict_proba(row)
+        timings.append(time.perf_counter() - start)
+    return np.percentile(timings, 50) * 1000, np.percentile(timings, 95) * 1000
+
+def batch_throughput(backend, X, repeats: int):
+    backend.predict_proba(X)  # Warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        backend.predict_proba(X)
+    return repeats * len(X) / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--rows", type=int, default=200, help="single-row predictions to time")
+    parser.add_argument("--batch-size", type=int, default=32, help="defaults to the API micro-batch size")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    X_test, _ = load_split('test', unpack=True)
+    X_test = X_test.astype(np.float64)
+    X_batch = np.resize(X_test, (args.batch_size, X_test.shape[1]))
+    model = get_artifact('disease_predictor')
+    reference = model.predict_proba(X_test)
+
+    print(f"{len(X_test)} test rows, batch of {args.batch_size}")
+    print(f"{'backend':<10}{'max |diff|':>12}{'p50 ms':>10}{'p95 ms':>10}{'rows/s':>12}")
+    for name in args.backends:
+        backend = BACKENDS[name](model)
+        diff = np.max(np.abs(backend.predict_proba(X_test) - reference))
+        p50, p95 = single_row_latency(backend, X_test, args.rows)
+        throughput = batch_throughput(backend, X_batch, args.repeats)
+        print(f"{name:<10}{diff:>12.1e}{p50:>10.3f}{p95:>10.3f}{throughput:>12.0f}")
+
+if __name__ == "__main__":
+    main()
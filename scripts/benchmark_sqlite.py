@@ -0,0 +1,119 @@
+"""
+Compare SQLite throughput with the default connection settings against the
+tuned profile in api.database (WAL, synchronous=NORMAL, busy timeout, ...).
+
+Each profile gets a fresh database file. Writers persist chat turns the way
+the /chat route does (two messages, one transaction); readers page through a
+conversation's latest messages, using the read-only pool for the tuned profile.
+
+    python scripts/benchmark_sqlite.py --writers 4 --readers 4 --seconds 5
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add the project root directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, event, insert, select
+from sqlalchemy.exc import OperationalError
+from api.database import Base, apply_sqlite_pragmas, to_read_only_url
+from api.models.db_models import User, Conversation, Message
+
+def make_engines(path: str, tuned: bool):
+    url = f"sqlite:///{path}"
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    if not tuned:
+        return engine, engine
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+    read_engine = create_engine(to_read_only_url(url), connect_args={"check_same_thread": False})
+    event.listen(
+        read_engine, "connect",
+        lambda dbapi_connection, connection_record: apply_sqlite_pragmas(dbapi_connection, read_only=True)
+    )
+    return engine, read_engine
+
+def seed(engine) -> int:
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        user_id = conn.execute(insert(User).values(
+            email="bench@medbot.com", username="bench", hashed_password="x"
+        )).inserted_primary_key[0]
+        return conn.execute(insert(Conversation).values(
+            user_id=user_id, title="Benchmark"
+        )).inserted_primary_key[0]
+
+def run_profile(tuned: bool, writers: int, readers: int, seconds: float):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        engine, read_engine = make_engines(path, tuned)
+        conversation_id = seed(engine)
+        counts = {"turns": 0, "reads": 0, "errors": 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + seconds
+
+        def count(key: str):
+            with lock:
+                counts[key] += 1
+
+        def write():
+            while time.perf_counter() < deadline:
+                now = datetime.now()
+                try:
+                    with engine.begin() as conn:
+                        conn.execute(insert(Message).values([
+                            {"conversation_id": conversation_id, "role": "user", "content": "I have a headache", "timestamp": now},
+                            {"conversation_id": conversation_id, "role": "assistant", "content": "How long have you had it?", "timestamp": now}
+                        ]))
+                    count("turns")
+                except OperationalError:
+                    count("errors")
+
+        def read():
+            query = (
+                select(Message.id, Message.role, Message.content, Message.timestamp)
+                .where(Message.conversation_id == conversation_id)
+                .order_by(Message.id.desc())
+                .limit(50)
+            )
+            while time.perf_counter() < deadline:
+                try:
+                    with read_engine.connect() as conn:
+                        conn.execute(query).all()
+                    count("reads")
+                except OperationalError:
+                    count("errors")
+
+        threads = [threading.Thread(target=write) for _ in range(writers)]
+        threads += [threading.Thread(target=read) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+        read_engine.dispose()
+        return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{args.writers} writers, {args.readers} readers, {args.seconds:g}s per profile")
+    print(f"{'profile':<10}{'turns/s':>12}{'reads/s':>12}{'errors':>10}")
+    for name, tuned in [("default", False), ("tuned", True)]:
+        counts = run_profile(tuned, args.writers, args.readers, args.seconds)
+        print(
+            f"{name:<10}{counts['turns'] / args.seconds:>12.1f}"
+            f"{counts['reads'] / args.seconds:>12.1f}{counts['errors']:>10}"
+        )
+
+if __name__ == "__main__":
+    main()
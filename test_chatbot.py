@@ -34,7 +34,7 @@ def test_chatbot():
                 # Process through chatbot
                 response = chatbot.process_input(symptom)
                 print(f"Chatbot response: {response['text']}")
-                print(f"Current symptoms: {chatbot.conversation_state['symptoms']}")
+                print(f"Current symptoms: {chatbot.conversation_state.symptoms}")
                 
             except Exception as e:
                 print(f"Error processing symptom: {str(e)}")
@@ -1,4 +1,4 @@
-from chatbot import MedicalChatbot
+from chatbot import MedicalChatbot, ConversationState
 from nlp.diagnosis_integration import DiagnosisIntegrator
 
 def test_real_symptoms():
@@ -60,10 +60,7 @@ def test_real_symptoms():
             print("-" * 30)
             
             # Reset chatbot state
-            chatbot.conversation_state = {
-                'symptoms': [],
-                'current_step': 'greeting'
-            }
+            chatbot.conversation_state = ConversationState()
             
             # Process each input
             for input_text in case['inputs']:
@@ -76,14 +73,14 @@ def test_real_symptoms():
                     # Process through chatbot
                     response = chatbot.process_input(input_text)
                     print(f"Chatbot response: {response['text']}")
-                    print(f"Current symptoms: {chatbot.conversation_state['symptoms']}")
+                    print(f"Current symptoms: {chatbot.conversation_state.symptoms}")
                     
                 except Exception as e:
                     print(f"Error processing input: {str(e)}")
                     continue
             
             # Get final diagnosis
-            if len(chatbot.conversation_state['symptoms']) >= 3:
+            if len(chatbot.conversation_state.symptoms) >= 3:
                 print("\nFinal Diagnosis:")
                 try:
                     response = chatbot.process_input("")
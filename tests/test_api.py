@@ -1 +1,160 @@
- 
\ No newline at end of file
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from api.auth.principal_cache import Principal
+from api.auth.utils import get_current_active_user
+from api.database import Base, get_async_db, get_read_db
+from api.models.db_models import Conversation, Diagnosis, Message, User
+from api.routes import chat, chatbot_routes, diagnosis_routes
+
+class APITestCase(unittest.TestCase):
+    """The chat and diagnosis routes on a temporary SQLite database, signed in as user 1."""
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.engine = create_engine(f"sqlite:///{self.path}")
+        Base.metadata.create_all(self.engine)
+        with Session(self.engine) as db:
+            db.add_all([
+                User(id=1, email="alice@example.com", username="alice", hashed_password="x"),
+                User(id=2, email="bob@example.com", username="bob", hashed_password="x")
+            ])
+            db.commit()
+
+        # No pooling: each TestClient request runs on its own event loop
+        self.async_engine = create_async_engine(f"sqlite+aiosqlite:///{self.path}", poolclass=NullPool)
+        self.sessions = async_sessionmaker(self.async_engine, expire_on_commit=False)
+
+        async def get_db():
+            async with self.sessions() as db:
+                yield db
+
+        app = FastAPI()
+        app.include_router(chatbot_routes, prefix="/api/chatbot")
+        app.include_router(diagnosis_routes, prefix="/api/diagnosis")
+        app.dependency_overrides[get_async_db] = get_db
+        app.dependency_overrides[get_read_db] = get_db
+        app.dependency_overrides[get_current_active_user] = lambda: Principal(id=1, username="alice")
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        self.client.close()
+        self.engine.dispose()
+        os.remove(self.path)
+
+    def add(self, *rows):
+        with Session(self.engine) as db:
+            db.add_all(rows)
+            db.commit()
+
+class TestHistoryPagination(APITestCase):
+    def pages(self, url, limit):
+        """Follow X-Next-Cursor from the first page to the last; returns the ids per page."""
+        pages, cursor = [], None
+        while True:
+            params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+            response = self.client.get(url, params=params)
+            self.assertEqual(response.status_code, 200, response.text)
+            pages.append([item["id"] for item in response.json()])
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                return pages
+
+    def test_conversation_pages_chain(self):
+        self.add(*(
+            Conversation(id=i, user_id=1, title=f"c{i}", created_at=datetime(2024, 1, i))
+            for i in range(1, 6)
+        ), Conversation(id=6, user_id=2, title="other user", created_at=datetime(2024, 1, 9)))
+        self.assertEqual(self.pages("/api/chatbot/conversations", 2), [[5, 4], [3, 2], [1]])
+
+    def test_ties_on_created_at_are_ordered_by_id(self):
+        same_time = datetime(2024, 1, 1, 12)
+        self.add(*(
+            Diagnosis(
+                id=i, user_id=1, symptoms=["cough"], predictions=[], primary_diagnosis="Cold",
+                confidence=0.5, created_at=same_time if i > 1 else datetime(2024, 1, 1)
+            )
+            for i in range(1, 6)
+        ))
+        # A page boundary falls inside the run of equal timestamps
+        self.assertEqual(self.pages("/api/diagnosis/diagnoses", 2), [[5, 4], [3, 2], [1]])
+
+    def test_invalid_cursor(self):
+        for cursor in ("not-a-cursor", "WzFd"):
+            response = self.client.get("/api/chatbot/conversations", params={"cursor": cursor})
+            self.assertEqual(response.status_code, 400)
+            response = self.client.get("/api/diagnosis/diagnoses", params={"cursor": cursor})
+            self.assertEqual(response.status_code, 400)
+
+    def test_summaries_leave_out_messages(self):
+        self.add(
+            Conversation(id=1, user_id=1, title="c1", created_at=datetime(2024, 1, 1)),
+            Message(id=1, conversation_id=1, role="user", content="hello")
+        )
+        summaries = self.client.get("/api/chatbot/conversations").json()
+        self.assertNotIn("messages", summaries[0])
+        full = self.client.get("/api/chatbot/conversations", params={"include_messages": "true"}).json()
+        self.assertEqual([m["content"] for m in full[0]["messages"]], ["hello"])
+
+class TestMessageStream(APITestCase):
+    def setUp(self):
+        super().setUp()
+        # The stream opens its own session rather than the request's
+        patch = mock.patch.object(chat, "ReadSessionLocal", self.sessions)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.add(
+            Conversation(id=1, user_id=1, title="mine"),
+            Conversation(id=2, user_id=2, title="someone else's"),
+            *(Message(id=i, conversation_id=1, role="user", content=f"m{i}") for i in range(1, 5)),
+            Message(id=5, conversation_id=2, role="user", content="private")
+        )
+        self.url = "/api/chatbot/conversations/1/messages"
+
+    def sse_events(self, body):
+        events = [block.splitlines() for block in body.strip().split("\n\n")]
+        return [(int(lines[0][len("id: "):]), json.loads(lines[2][len("data: "):])["content"]) for lines in events]
+
+    def test_ndjson_by_default(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("application/x-ndjson"))
+        contents = [json.loads(line)["content"] for line in response.text.splitlines()]
+        self.assertEqual(contents, ["m1", "m2", "m3", "m4"])
+
+    def test_sse_from_accept_header_or_format(self):
+        for kwargs in ({"headers": {"Accept": "text/event-stream"}}, {"params": {"format": "sse"}}):
+            response = self.client.get(self.url, **kwargs)
+            self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+            self.assertEqual(self.sse_events(response.text), [(1, "m1"), (2, "m2"), (3, "m3"), (4, "m4")])
+        # An explicit format wins over the Accept header
+        response = self.client.get(self.url, params={"format": "ndjson"}, headers={"Accept": "text/event-stream"})
+        self.assertTrue(response.headers["content-type"].startswith("application/x-ndjson"))
+        self.assertEqual(self.client.get(self.url, params={"format": "xml"}).status_code, 422)
+
+    def test_resume_after_id_or_last_event_id(self):
+        response = self.client.get(self.url, params={"after_id": 2})
+        self.assertEqual([json.loads(line)["id"] for line in response.text.splitlines()], [3, 4])
+        response = self.client.get(self.url, params={"format": "sse"}, headers={"Last-Event-ID": "3"})
+        self.assertEqual(self.sse_events(response.text), [(4, "m4")])
+        # after_id takes precedence over the header
+        response = self.client.get(self.url, params={"after_id": 1}, headers={"Last-Event-ID": "3"})
+        self.assertEqual([json.loads(line)["id"] for line in response.text.splitlines()], [2, 3, 4])
+
+    def test_other_users_conversation_is_not_found(self):
+        response = self.client.get("/api/chatbot/conversations/2/messages")
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.get("/api/chatbot/conversations/99/messages").status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import asyncio
+import unittest
+from api.ml.batching import MicroBatcher
+
+class TestMicroBatcher(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+    def _predict_batch(self, items):
+        self.calls.append(list(items))
+        return [item * 2 for item in items]
+
+    def test_concurrent_requests_are_batched(self):
+        async def run():
+            batcher = MicroBatcher(self._predict_batch, max_batch_size=8, max_wait_ms=50)
+            results = await asyncio.gather(*[batcher.submit(i) for i in range(20)])
+            await batcher.stop()
+            return results, batcher
+
+        results, batcher = asyncio.run(run())
+        self.assertEqual(results, [i * 2 for i in range(20)])
+        self.assertEqual([len(call) for call in self.calls], [8, 8, 4])
+        self.assertEqual(batcher.stats()['items'], 20)
+        self.assertEqual(batcher.stats()['batch_size']['count'], 3)
+
+    def test_errors_reach_every_caller(self):
+        def failing(items):
+            raise ValueError("boom")
+
+        async def run():
+            batcher = MicroBatcher(failing, max_batch_size=4, max_wait_ms=10)
+            results = await asyncio.gather(
+                *[batcher.submit(i) for i in range(3)], return_exceptions=True
+            )
+            await batcher.stop()
+            return results
+
+        for result in asyncio.run(run()):
+            self.assertIsInstance(result, ValueError)
+
+if __name__ == '__main__':
+    unittest.main()
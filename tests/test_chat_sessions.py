@@ -0,0 +1,64 @@
+import asyncio
+import time
+import unittest
+from unittest import mock
+import spacy
+from api import chat_sessions
+from api.chat_sessions import conversation_turn, get_session_store
+
+class TestConversationTurn(unittest.TestCase):
+    def test_turns_of_one_conversation_are_serialized(self):
+        events = []
+
+        async def turn(conversation_id, name):
+            async with conversation_turn(conversation_id):
+                events.append(f"{name} start")
+                await asyncio.sleep(0.01)
+                events.append(f"{name} end")
+
+        async def run():
+            await asyncio.gather(turn(1, "a"), turn(1, "b"), turn(2, "c"))
+
+        asyncio.run(run())
+        self.assertLess(events.index("a end"), events.index("b start"))
+        # Another conversation doesn't wait
+        self.assertLess(events.index("c start"), events.index("a end"))
+        self.assertEqual(chat_sessions._conversation_locks, {})
+
+    def test_failed_turn_drops_cached_state(self):
+        store = get_session_store()
+        store.put(7, "advanced state")
+
+        async def run():
+            async with conversation_turn(7):
+                raise RuntimeError("insert failed")
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(run())
+        self.assertIsNone(store.get(7))
+
+@unittest.skipUnless(spacy.util.is_package("en_core_web_sm"), "the en_core_web_sm spaCy model is not installed")
+class TestGetChatbot(unittest.TestCase):
+    def tearDown(self):
+        chat_sessions._chatbot = None
+        chat_sessions._chatbot_error = None
+
+    def test_failed_load_is_retried_after_interval(self):
+        attempts = []
+
+        class Broken:
+            def __init__(self):
+                attempts.append(1)
+                raise OSError("model missing")
+
+        with mock.patch("chatbot.main_chatbot.MedicalChatbot", Broken), \
+                mock.patch.object(chat_sessions, "CHATBOT_RETRY_INTERVAL", 0.05):
+            self.assertIsNone(asyncio.run(chat_sessions.get_chatbot()))
+            self.assertIsNone(asyncio.run(chat_sessions.get_chatbot()))
+            self.assertEqual(len(attempts), 1)
+            time.sleep(0.06)
+            asyncio.run(chat_sessions.get_chatbot())
+            self.assertEqual(len(attempts), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.ensemble import RandomForestClassifier
+from models.compiled_forest import CompiledForest
+
+class TestCompiledForest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.X = (rng.random((300, 20)) < 0.2).astype(np.float64)
+        self.y = (self.X[:, 0] + 2 * self.X[:, 1] + self.X[:, 2] * self.X[:, 3]).astype(int)
+
+    def test_binary_matches_predict_proba(self):
+        forest = RandomForestClassifier(n_estimators=25, max_depth=8, class_weight='balanced', random_state=0)
+        forest.fit(self.X, self.y)
+        compiled = CompiledForest.from_sklearn(forest)
+        self.assertTrue(compiled.binary)
+        np.testing.assert_allclose(compiled.predict_proba(self.X), forest.predict_proba(self.X), atol=1e-12)
+        np.testing.assert_array_equal(compiled.predict(self.X), forest.predict(self.X))
+
+    def test_continuous_features_use_thresholds(self):
+        X = np.random.default_rng(1).normal(size=(300, 5))
+        forest = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, X[:, 0] > 0.3)
+        compiled = CompiledForest.from_sklearn(forest)
+        self.assertFalse(compiled.binary)
+        np.testing.assert_allclose(compiled.predict_proba(X), forest.predict_proba(X), atol=1e-12)
+
+    def test_chunking_and_shape_checks(self):
+        forest = RandomForestClassifier(n_estimators=5, random_state=0).fit(self.X, self.y)
+        compiled = CompiledForest.from_sklearn(forest)
+        np.testing.assert_allclose(
+            compiled.predict_proba(self.X, chunk_size=7), compiled.predict_proba(self.X)
+        )
+        self.assertEqual(compiled.predict_proba(self.X[:0]).shape, (0, len(forest.classes_)))
+        with self.assertRaises(ValueError):
+            compiled.predict_proba(self.X[:, :3])
+
+    def test_sparse_input_matches_dense(self):
+        forest = RandomForestClassifier(n_estimators=5, random_state=0).fit(self.X, self.y)
+        compiled = CompiledForest.from_sklearn(forest)
+        np.testing.assert_allclose(
+            compiled.predict_proba(csr_matrix(self.X), chunk_size=64), compiled.predict_proba(self.X)
+        )
+
+if __name__ == '__main__':
+    unittest.main()
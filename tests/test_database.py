@@ -0,0 +1,29 @@
+import unittest
+from sqlalchemy import create_engine, text
+from api.database import Base, missing_columns
+from api.models import db_models  # noqa: F401  (registers the tables)
+
+class TestSchemaCheck(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_current_schema(self):
+        with self.engine.begin() as conn:
+            Base.metadata.create_all(conn)
+            self.assertEqual(missing_columns(conn), [])
+
+    def test_reports_columns_added_since(self):
+        with self.engine.begin() as conn:
+            # diagnoses as created before model versions were recorded
+            conn.execute(text(
+                "CREATE TABLE diagnoses (id INTEGER PRIMARY KEY, user_id INTEGER, conversation_id INTEGER, "
+                "symptoms JSON, predictions JSON, primary_diagnosis VARCHAR, confidence FLOAT, created_at DATETIME)"
+            ))
+            Base.metadata.create_all(conn)
+            self.assertEqual(missing_columns(conn), ["diagnoses.model_version"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import tempfile
+import unittest
+from pathlib import Path
+import numpy as np
+from data.dataset import save_splits, load_split, load_manifest, verify_checksums
+
+class TestDataset(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        self.X = rng.integers(0, 2, size=(50, 13))
+        self.y = rng.integers(0, 5, size=50)
+        save_splits({'train': (self.X, self.y)}, [f's{i}' for i in range(13)],
+                    ['a', 'b', 'c', 'd', 'e'], self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        X, y = load_split('train', self.tmp.name, unpack=True)
+        np.testing.assert_array_equal(X, self.X)
+        np.testing.assert_array_equal(y, self.y)
+        self.assertEqual(load_manifest(self.tmp.name)['classes'], ['a', 'b', 'c', 'd', 'e'])
+
+    def test_packed_by_default(self):
+        X, _ = load_split('train', self.tmp.name)
+        self.assertIsInstance(X, np.memmap)
+        self.assertEqual(X.shape, (50, 2))
+        self.assertTrue(verify_checksums(self.tmp.name))
+
+    def test_corrupt_split_is_rejected(self):
+        path = Path(self.tmp.name) / 'y_train.npy'
+        data = bytearray(path.read_bytes())
+        data[-1] ^= 1
+        path.write_bytes(bytes(data))
+        with self.assertRaises(ValueError):
+            load_split('train', self.tmp.name)
+
+    def test_rejects_non_binary(self):
+        with self.assertRaises(ValueError):
+            save_splits({'bad': (self.X * 2, self.y)}, [], [], self.tmp.name)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import tempfile
+import unittest
+from pathlib import Path
+import joblib
+import numpy as np
+import spacy
+
+# Importing the nlp package loads spaCy's en_core_web_sm
+HAS_MODEL = spacy.util.is_package("en_core_web_sm")
+if HAS_MODEL:
+    from nlp.generate_patterns_from_data import (
+        co_occurrence_counts,
+        load_matcher_artifact,
+        make_pattern_docs,
+        matcher_artifact_key,
+        save_matcher_artifact,
+        top_co_occurrences
+    )
+
+@unittest.skipUnless(HAS_MODEL, "the en_core_web_sm spaCy model is not installed")
+class TestCoOccurrence(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv_path = Path(self.tmp.name) / 'symptoms.csv'
+        # Only values equal to 1 count as reported
+        self.csv_path.write_text(
+            "a,b,c,prognosis\n"
+            "1,1,0,P\n"
+            "1,1,1,Q\n"
+            "0,1,1,P\n"
+            "1,0,2,Q\n"
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_counts_by_hand(self):
+        expected = np.array([
+            [3, 2, 1],
+            [2, 3, 2],
+            [1, 2, 2]
+        ])
+        for chunksize in (None, 1, 3):
+            with self.subTest(chunksize=chunksize):
+                columns, counts = co_occurrence_counts(self.csv_path, chunksize)
+                self.assertEqual(columns, ['a', 'b', 'c'])
+                np.testing.assert_array_equal(counts, expected)
+
+    def test_top_partners(self):
+        _, counts = co_occurrence_counts(self.csv_path)
+        # b is tied between a and c; the earlier column wins
+        self.assertEqual(top_co_occurrences(counts, k=1, min_count=1), [[1], [0], [1]])
+        self.assertEqual(top_co_occurrences(counts, k=2, min_count=1), [[1], [0, 2], [1]])
+
+@unittest.skipUnless(HAS_MODEL, "the en_core_web_sm spaCy model is not installed")
+class TestMatcherArtifact(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.patterns_path = Path(self.tmp.name) / 'symptom_patterns.joblib'
+        self.matcher_path = Path(self.tmp.name) / 'symptom_matcher.joblib'
+        joblib.dump({'high_fever': ['high fever', 'pyrexia']}, self.patterns_path)
+        self.nlp = spacy.blank("en")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_until_patterns_change(self):
+        key = matcher_artifact_key(self.nlp, self.patterns_path)
+        docs = make_pattern_docs(self.nlp, joblib.load(self.patterns_path))
+        save_matcher_artifact(docs, key, self.matcher_path)
+
+        loaded = load_matcher_artifact(self.nlp, key, self.matcher_path)
+        self.assertEqual(
+            {label: [doc.text for doc in label_docs] for label, label_docs in loaded.items()},
+            {label: [doc.text for doc in label_docs] for label, label_docs in docs.items()}
+        )
+
+        joblib.dump({'high_fever': ['high fever']}, self.patterns_path)
+        new_key = matcher_artifact_key(self.nlp, self.patterns_path)
+        self.assertNotEqual(new_key, key)
+        self.assertIsNone(load_matcher_artifact(self.nlp, new_key, self.matcher_path))
+
+    def test_missing_artifact(self):
+        self.assertIsNone(load_matcher_artifact(self.nlp, 'key', self.matcher_path))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import asyncio
+import threading
+import unittest
+from passlib.context import CryptContext
+from api.auth.hashing import PasswordHasher, PasswordHasherBusy
+
+def bcrypt_context(rounds):
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+class BlockingContext:
+    """Hashes only once released, to hold operations in flight."""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def hash(self, password):
+        self.release.wait(5)
+        return f"hashed:{password}"
+
+class TestPasswordHasher(unittest.TestCase):
+    def test_busy_once_workers_and_queue_are_full(self):
+        context = BlockingContext()
+        hasher = PasswordHasher(context, workers=1, max_queue=1)
+
+        async def run():
+            admitted = [asyncio.ensure_future(hasher.hash(str(i))) for i in range(2)]
+            await asyncio.sleep(0)
+            self.assertEqual(hasher.stats()["in_flight"], 2)
+            with self.assertRaises(PasswordHasherBusy):
+                await hasher.hash("2")
+            context.release.set()
+            return await asyncio.gather(*admitted)
+
+        self.assertEqual(asyncio.run(run()), ["hashed:0", "hashed:1"])
+        stats = hasher.stats()
+        self.assertEqual((stats["in_flight"], stats["rejected"]), (0, 1))
+
+    def test_outdated_cost_is_rehashed(self):
+        old_hash = bcrypt_context(4).hash("secret")
+        hasher = PasswordHasher(bcrypt_context(5), workers=1, max_queue=1)
+        valid, new_hash = asyncio.run(hasher.verify_and_update("secret", old_hash))
+        self.assertTrue(valid)
+        self.assertIn("$05$", new_hash)
+        self.assertTrue(bcrypt_context(5).verify("secret", new_hash))
+        self.assertEqual(asyncio.run(hasher.verify_and_update("secret", new_hash)), (True, None))
+        self.assertEqual(asyncio.run(hasher.verify_and_update("wrong", new_hash)), (False, None))
+        self.assertEqual(hasher.rehashed, 1)
+
+    def test_latency_and_queue_wait_are_recorded(self):
+        hasher = PasswordHasher(bcrypt_context(4), workers=1, max_queue=4)
+
+        async def run():
+            return await asyncio.gather(*(hasher.hash("secret") for _ in range(3)))
+
+        asyncio.run(run())
+        stats = hasher.stats()
+        for name in ("hash_latency_ms", "queue_wait_ms"):
+            self.assertEqual(stats[name]["count"], 3)
+            self.assertEqual(stats[name]["buckets"]["le_+Inf"], 3)
+        self.assertGreater(stats["hash_latency_ms"]["sum"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -27,5 +27,40 @@ class TestIntegration(unittest.TestCase):
         self.assertIn('headache', result['extraction_result']['exact_matches'])
         self.assertIn('vomiting', result['extraction_result']['exact_matches'])
 
+def loop_scores(disease_patterns, symptoms, top_k=5):
+    """The per-disease loop predict_disease used before the incidence matrix"""
+    predictions = []
+    for disease, pattern in disease_patterns.items():
+        matches = sum(1 for symptom in symptoms if symptom in pattern)
+        predictions.append((disease, matches / len(pattern)))
+    predictions.sort(key=lambda x: x[1], reverse=True)
+    return predictions[:top_k]
+
+class TestIncidenceScoring(unittest.TestCase):
+    def setUp(self):
+        self.integrator = DiagnosisIntegrator()
+        self.integrator.disease_patterns = {
+            'A': ['x', 'y'],
+            'B': ['y', 'z', 'w'],
+            'C': ['x', 'x', 'z'],  # A repeat matches once but still counts towards the length
+            'D': ['w'],
+            'E': ['v', 'u'],
+            'F': ['y']
+        }
+        self.integrator._build_incidence_matrix()
+
+    def test_batch_matches_per_disease_loop(self):
+        symptom_lists = [
+            [], ['x'], ['y'], ['x', 'y', 'z'], ['w', 'w'], ['unknown', 'z'], ['y', 'y', 'x']
+        ]
+        results = self.integrator.predict_disease_batch(symptom_lists)
+        for symptoms, result in zip(symptom_lists, results):
+            with self.subTest(symptoms=symptoms):
+                expected = loop_scores(self.integrator.disease_patterns, symptoms)
+                self.assertEqual([d for d, _ in result['predictions']], [d for d, _ in expected])
+                for (_, score), (_, reference) in zip(result['predictions'], expected):
+                    self.assertAlmostEqual(score, reference)
+                self.assertEqual(result['symptoms_used'], symptoms)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,28 @@
+import unittest
+from nlp.keyword_matcher import KeywordMatcher
+
+class TestKeywordMatcher(unittest.TestCase):
+    def setUp(self):
+        self.matcher = KeywordMatcher({
+            'sweating': ['sweating', 'sweat', 'perspiration'],
+            'cough': ['cough', 'coughing', 'hacking cough'],
+            'sore throat': ['sore throat', 'throat pain']
+        })
+
+    def test_word_boundaries(self):
+        self.assertEqual(self.matcher.find("I bought a new sweater"), [])
+        self.assertEqual(
+            [m.keyword for m in self.matcher.find("I sweat at night")], ['sweating'])
+
+    def test_longest_variation_and_spans(self):
+        text = "A hacking  cough and a sore throat"
+        matches = self.matcher.find(text)
+        self.assertEqual([m.keyword for m in matches], ['cough', 'sore throat'])
+        self.assertEqual(text[matches[0].start:matches[0].end].lower(), 'hacking  cough')
+        self.assertEqual((matches[1].start, matches[1].end), (23, 34))
+
+    def test_empty_mapping(self):
+        self.assertEqual(KeywordMatcher({}).find("cough"), [])
+
+if __name__ == '__main__':
+    unittest.main()
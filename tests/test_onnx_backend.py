@@ -0,0 +1,41 @@
+import tempfile
+import unittest
+from pathlib import Path
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.ensemble import RandomForestClassifier
+from models.onnx_backend import export_onnx, load_onnx
+
+try:
+    import onnxruntime  # noqa: F401
+    import skl2onnx  # noqa: F401
+    HAS_ONNX = True
+except ImportError:
+    HAS_ONNX = False
+
+@unittest.skipUnless(HAS_ONNX, "skl2onnx and onnxruntime are not installed")
+class TestOnnxBackend(unittest.TestCase):
+    def test_matches_predict_proba(self):
+        rng = np.random.default_rng(0)
+        X = (rng.random((300, 20)) < 0.2).astype(np.float64)
+        y = (X[:, 0] + 2 * X[:, 1] + X[:, 2] * X[:, 3]).astype(int)
+        forest = RandomForestClassifier(n_estimators=25, max_depth=8, class_weight='balanced', random_state=0)
+        forest.fit(X, y)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = export_onnx(forest, X.shape[1], Path(tmp) / 'model.onnx', source_sha256='ab' * 32)
+            model = load_onnx(path, intra_op_threads=1, classes=forest.classes_)
+            self.assertEqual(model.source_sha256, 'ab' * 32)
+            # onnxruntime computes in float32
+            np.testing.assert_allclose(model.predict_proba(X), forest.predict_proba(X), atol=1e-5)
+            np.testing.assert_allclose(model.predict_proba(csr_matrix(X)), model.predict_proba(X))
+            np.testing.assert_array_equal(model.predict(X), forest.predict(X))
+            with self.assertRaises(ValueError):
+                model.predict_proba(X[:, :3])
+
+    def test_missing_export(self):
+        with self.assertRaises(FileNotFoundError):
+            load_onnx('does/not/exist.onnx')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+import numpy as np
+from api.ml.prediction_cache import PredictionCache
+from models.engine import index_set_key
+
+class TestPredictionCache(unittest.TestCase):
+    def test_key_is_canonical(self):
+        self.assertEqual(index_set_key(np.array([5, 1, 5, 3])), index_set_key([1, 3, 5]))
+        self.assertNotEqual(index_set_key([1, 3]), index_set_key([1, 3, 5]))
+
+    def test_least_recently_used_is_evicted(self):
+        cache = PredictionCache(max_entries=2)
+        cache.set_version("v1")
+        cache.put("v1", "a", 1)
+        cache.put("v1", "b", 2)
+        cache.get("v1", "a")
+        cache.put("v1", "c", 3)
+        self.assertIsNone(cache.get("v1", "b"))
+        self.assertEqual(cache.get("v1", "a"), 1)
+        self.assertEqual((cache.hits, cache.misses, cache.evictions), (2, 1, 1))
+
+    def test_new_version_invalidates(self):
+        cache = PredictionCache()
+        cache.set_version("v1")
+        cache.put("v1", "a", 1)
+        cache.set_version("v2")
+        self.assertIsNone(cache.get("v2", "a"))
+        # Late results from the replaced model are not stored
+        cache.put("v1", "a", 1)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.invalidations, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import tempfile
+import time
+import unittest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from api.auth import principal_cache
+from api.auth.principal_cache import InMemoryBackend, Principal, PrincipalCache, PrincipalCacheBackend
+from api.database import Base
+from api.models.db_models import User
+
+class TestPrincipalCache(unittest.TestCase):
+    def test_hit_and_invalidate(self):
+        cache = PrincipalCache(ttl=60)
+        cache.set(Principal(id=1, username="alice"))
+        self.assertEqual(cache.get("alice").id, 1)
+        cache.invalidate("alice")
+        self.assertIsNone(cache.get("alice"))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_entries_expire(self):
+        cache = PrincipalCache(ttl=0.01)
+        cache.set(Principal(id=1, username="alice"))
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("alice"))
+
+    def test_least_recently_used_is_evicted(self):
+        backend = InMemoryBackend(max_size=2)
+        cache = PrincipalCache(backend=backend, ttl=60)
+        for i, name in enumerate(["a", "b"]):
+            cache.set(Principal(id=i, username=name))
+        cache.get("a")
+        cache.set(Principal(id=2, username="c"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertEqual(len(backend), 2)
+
+    def test_backend_must_implement_interface(self):
+        class Partial(PrincipalCacheBackend):
+            def get(self, key):
+                return None
+
+        with self.assertRaises(TypeError):
+            Partial()
+
+class TestUserChangesInvalidate(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.engine = create_engine(f"sqlite:///{self.path}")
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        with self.Session() as db:
+            db.add(User(email="alice@example.com", username="alice", hashed_password="x", is_active=True))
+            db.commit()
+
+        previous = principal_cache._cache
+        self.cache = PrincipalCache(ttl=60)
+        principal_cache.set_principal_cache(self.cache)
+        self.addCleanup(setattr, principal_cache, "_cache", previous)
+        with self.Session() as db:
+            self.cache.set(Principal.from_user(db.query(User).filter_by(username="alice").one()))
+
+    def tearDown(self):
+        self.engine.dispose()
+        os.remove(self.path)
+
+    def test_deactivation_drops_entry_on_commit(self):
+        with self.Session() as db:
+            user = db.query(User).filter_by(username="alice").one()
+            user.is_active = False
+            db.flush()
+            # Not committed yet: other requests may still see the old row
+            self.assertIsNotNone(self.cache.get("alice"))
+            db.commit()
+        self.assertIsNone(self.cache.get("alice"))
+
+    def test_rename_drops_old_subject(self):
+        with self.Session() as db:
+            db.query(User).filter_by(username="alice").one().username = "alicia"
+            db.commit()
+        self.assertIsNone(self.cache.get("alice"))
+
+    def test_delete_drops_entry(self):
+        with self.Session() as db:
+            db.delete(db.query(User).filter_by(username="alice").one())
+            db.commit()
+        self.assertIsNone(self.cache.get("alice"))
+
+    def test_rolled_back_change_keeps_entry(self):
+        with self.Session() as db:
+            db.query(User).filter_by(username="alice").one().is_admin = True
+            db.flush()
+            db.rollback()
+        self.assertIsNotNone(self.cache.get("alice"))
+        with self.Session() as db:
+            db.commit()
+        self.assertIsNotNone(self.cache.get("alice"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import joblib
+import numpy as np
+from models.registry import ModelRegistry
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'weights.joblib'
+        joblib.dump({'weights': np.arange(10.0)}, self.path)
+        self.registry = ModelRegistry({'weights': self.path})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_loads_once_and_shares(self):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            artifacts = list(pool.map(lambda _: self.registry.get('weights'), range(16)))
+        self.assertTrue(all(a is artifacts[0] for a in artifacts))
+        self.assertEqual(self.registry.loaded(), ['weights'])
+
+    def test_arrays_are_memory_mapped_read_only(self):
+        weights = self.registry.get('weights')['weights']
+        self.assertIsInstance(weights, np.memmap)
+        self.assertFalse(weights.flags.writeable)
+
+    def test_replaced_file_is_not_current(self):
+        self.registry.get('weights')
+        self.assertTrue(self.registry.is_current('weights'))
+        joblib.dump({'weights': np.arange(20.0)}, self.path)
+        self.assertFalse(self.registry.is_current('weights'))
+        self.registry.put('weights', self.registry.load('weights'))
+        self.assertTrue(self.registry.is_current('weights'))
+
+    def test_unknown_artifact(self):
+        with self.assertRaises(KeyError):
+            self.registry.get('missing')
+
+if __name__ == '__main__':
+    unittest.main()
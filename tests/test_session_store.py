@@ -0,0 +1,79 @@
+import json
+import time
+import unittest
+import spacy
+from api.session_store import SessionStore
+
+# The chatbot package loads spaCy's en_core_web_sm on import
+HAS_MODEL = spacy.util.is_package("en_core_web_sm")
+if HAS_MODEL:
+    from chatbot.main_chatbot import ConversationState, MedicalChatbot
+
+class FakeIntegrator:
+    """Matches symptom names written verbatim in the text."""
+
+    def text_to_features(self, text):
+        return {'exact_matches': [word for word in text.split() if word.endswith('_sym')]}
+
+    def predict_disease(self, symptoms):
+        return {'predictions': [('Flu', 0.8), ('Cold', 0.2)]}
+
+def make_chatbot():
+    chatbot = MedicalChatbot.__new__(MedicalChatbot)
+    chatbot.diagnosis_integrator = FakeIntegrator()
+    chatbot.conversation_state = ConversationState()
+    with open('chatbot/data/conversation_flow.json') as f:
+        chatbot.flow = json.load(f)
+    return chatbot
+
+@unittest.skipUnless(HAS_MODEL, "the en_core_web_sm spaCy model is not installed")
+class TestConversationState(unittest.TestCase):
+    def test_states_are_independent(self):
+        chatbot = make_chatbot()
+        first, second = ConversationState(), ConversationState()
+        chatbot.process_input("hi", first)
+        chatbot.process_input("a_sym b_sym", first)
+        chatbot.process_input("hi", second)
+        self.assertEqual((first.current_step, first.symptoms), ('symptom_collection', ['a_sym', 'b_sym']))
+        self.assertEqual((second.current_step, second.symptoms), ('symptom_collection', []))
+        # The default state used by the CLI is untouched
+        self.assertEqual(chatbot.conversation_state.current_step, 'greeting')
+
+    def test_full_flow_resets(self):
+        chatbot = make_chatbot()
+        state = ConversationState()
+        for text in ["hi", "a_sym b_sym c_sym"]:
+            chatbot.process_input(text, state)
+        self.assertEqual(state.current_step, 'diagnosis')
+        response = chatbot.process_input("ok", state)
+        self.assertEqual(response['diagnosis']['predictions'][0], ('Flu', 0.8))
+        chatbot.process_input("bye", state)
+        self.assertEqual((state.current_step, state.symptoms), ('greeting', []))
+
+class TestSessionStore(unittest.TestCase):
+    def test_least_recently_used_is_evicted(self):
+        store = SessionStore(max_sessions=2)
+        store.put(1, "a")
+        store.put(2, "b")
+        store.get(1)
+        store.put(3, "c")
+        self.assertIsNone(store.get(2))
+        self.assertEqual(store.get(1), "a")
+        self.assertEqual(len(store), 2)
+        self.assertEqual(store.stats()['evictions'], 1)
+
+    def test_idle_states_expire(self):
+        store = SessionStore(ttl=0.01)
+        store.put(1, "a")
+        time.sleep(0.02)
+        self.assertIsNone(store.get(1))
+        self.assertEqual((store.hits, store.misses), (0, 1))
+
+    def test_pop(self):
+        store = SessionStore()
+        store.put(1, "a")
+        self.assertEqual(store.pop(1), "a")
+        self.assertIsNone(store.pop(1))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+import spacy
+
+HAS_MODEL = spacy.util.is_package("en_core_web_sm")
+
+@unittest.skipUnless(HAS_MODEL, "the en_core_web_sm spaCy model is not installed")
+class TestSymptomExtraction(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from nlp.symptom_extraction import ComprehensiveSymptomExtractor
+        cls.extractor = ComprehensiveSymptomExtractor()
+
+    def test_extract_many_matches_extract(self):
+        texts = [
+            "I have a headache and nausea but no fever",
+            "Itching and a skin rash since Monday",
+            "Not coughing, without vomiting",
+            "",
+            "HIGH FEVER, chills and muscle pain"
+        ]
+        # extract_many runs with every pipeline component disabled
+        self.assertEqual(
+            list(self.extractor.extract_many(texts, batch_size=2)),
+            [self.extractor.extract(text) for text in texts]
+        )
+
+if __name__ == '__main__':
+    unittest.main()
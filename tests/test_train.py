@@ -0,0 +1,49 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from models.registry import file_sha256
+from models.training import train
+
+class TestExports(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        patch = mock.patch.object(train, 'SAVED_MODELS_DIR', self.dir)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.addCleanup(self.tmp.cleanup)
+        rng = np.random.default_rng(0)
+        self.X = (rng.random((100, 8)) < 0.3).astype(np.float64)
+        self.y = (self.X[:, 0] + self.X[:, 1]).astype(int)
+        # Exports of the previous model
+        self.compiled = self.dir / 'disease_predictor_compiled.joblib'
+        self.onnx = self.dir / 'disease_predictor.onnx'
+        self.compiled.write_bytes(b'old')
+        self.onnx.write_bytes(b'old')
+
+    def test_skipped_exports_remove_previous_ones(self):
+        model = LogisticRegression().fit(self.X, self.y)
+        source = train.save_model(model)
+        self.assertIsNone(train.export_compiled_model(model, self.X, source))
+        with mock.patch.object(train, 'export_onnx', side_effect=ImportError("no skl2onnx")):
+            self.assertIsNone(train.export_onnx_model(model, self.X, source))
+        self.assertFalse(self.compiled.exists())
+        self.assertFalse(self.onnx.exists())
+
+    def test_model_is_published_after_its_exports(self):
+        model = RandomForestClassifier(n_estimators=5, random_state=0).fit(self.X, self.y)
+        source = train.save_model(model)
+        path = self.dir / 'disease_predictor.joblib'
+        self.assertFalse(path.exists())
+        compiled = train.export_compiled_model(model, self.X, source)
+        self.assertEqual(compiled.source_sha256, source)
+        train.publish_model()
+        self.assertEqual(file_sha256(path), source)
+        self.assertEqual(sorted(p.name for p in self.dir.iterdir() if p.name.startswith('.')), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from sqlalchemy import CheckConstraint, Column, Integer, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+from api.write_behind import WriteBehindBuffer, WriteBehindFull
+
+Base = declarative_base()
+
+class Row(Base):
+    __tablename__ = "rows"
+    id = Column(Integer, primary_key=True)
+    value = Column(Integer, CheckConstraint("value >= 0"), nullable=False)
+
+class FlakySessions:
+    """Session factory whose first `failures` sessions fail as if the database were down."""
+
+    def __init__(self, factory, failures: int = 0):
+        self.factory = factory
+        self.failures = failures
+
+    def __call__(self):
+        if self.failures > 0:
+            self.failures -= 1
+            raise OperationalError("INSERT", {}, Exception("database is locked"))
+        return self.factory()
+
+class TestWriteBehindBuffer(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def run_with_buffer(self, scenario, failures: int = 0, **kwargs):
+        async def run():
+            engine = create_async_engine(f"sqlite+aiosqlite:///{self.path}")
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            sessions = FlakySessions(async_sessionmaker(engine), failures)
+            buffer = WriteBehindBuffer(model=Row, interval_ms=10000, session_factory=sessions, **kwargs)
+            buffer.start()
+            try:
+                result = await scenario(buffer, sessions)
+            finally:
+                sessions.failures = 0
+                await buffer.stop()
+            async with sessions.factory() as db:
+                stored = (await db.execute(select(Row.value).order_by(Row.id))).scalars().all()
+            await engine.dispose()
+            return result, stored
+
+        return asyncio.run(run())
+
+    def test_failed_flush_is_retried_in_order(self):
+        async def scenario(buffer, sessions):
+            await buffer.enqueue([{"value": 1}, {"value": 2}])
+            with self.assertRaises(OperationalError):
+                await buffer.flush()
+            await buffer.enqueue([{"value": 3}])
+            await buffer.flush()
+            return buffer
+
+        buffer, stored = self.run_with_buffer(scenario, failures=1)
+        self.assertEqual(stored, [1, 2, 3])
+        self.assertEqual((buffer.errors, buffer.dropped, buffer.pending), (1, 0, 0))
+
+    def test_rejected_row_is_dead_lettered_after_retries(self):
+        async def scenario(buffer, sessions):
+            await buffer.enqueue([{"value": 1}, {"value": -1}, {"value": 2}])
+            for _ in range(2):
+                with self.assertRaises(Exception):
+                    await buffer.flush()
+            # Third failure: rows are written one by one and the bad one is dropped
+            await buffer.flush()
+            await buffer.enqueue([{"value": 3}])
+            await buffer.flush()
+            return buffer
+
+        buffer, stored = self.run_with_buffer(scenario, max_retries=3)
+        self.assertEqual(stored, [1, 2, 3])
+        self.assertEqual(buffer.dropped, 1)
+        self.assertEqual(buffer.dead_letters[0][0], {"value": -1})
+
+    def test_outage_keeps_rows_instead_of_dropping(self):
+        async def scenario(buffer, sessions):
+            await buffer.enqueue([{"value": 1}])
+            for _ in range(3):
+                with self.assertRaises(Exception):
+                    await buffer.flush()
+            return buffer.pending
+
+        pending, stored = self.run_with_buffer(scenario, failures=10, max_retries=2)
+        self.assertEqual(pending, 1)
+        self.assertEqual(stored, [1])  # Written by stop() once the database is back
+
+    def test_full_buffer_waits_for_flush(self):
+        async def scenario(buffer, sessions):
+            await buffer.enqueue([{"value": i} for i in range(3)])
+            # Doesn't fit: enqueue flushes first, and never holds more than max_pending
+            await buffer.enqueue([{"value": 3}, {"value": 4}])
+            return buffer.pending, buffer.full_waits
+
+        (pending, full_waits), stored = self.run_with_buffer(scenario, max_pending=4)
+        self.assertEqual((pending, full_waits), (2, 1))
+        self.assertEqual(stored, [0, 1, 2, 3, 4])
+
+    def test_full_buffer_times_out_without_accepting(self):
+        async def scenario(buffer, sessions):
+            await buffer.enqueue([{"value": 1}, {"value": 2}])
+            with self.assertRaises(WriteBehindFull):
+                await buffer.enqueue([{"value": 3}])
+            return buffer.pending
+
+        pending, stored = self.run_with_buffer(
+            scenario, failures=1000, max_pending=2, enqueue_timeout=0.05
+        )
+        self.assertEqual(pending, 2)
+        self.assertEqual(stored, [1, 2])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,13 @@
+import tempfile
+import threading
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
 import numpy as np
+from explainable_ai import xai_methods
 from explainable_ai.pipeline import XAIPipeline
+from models.registry import get_registry
 
 class TestXAI(unittest.TestCase):
     def setUp(self):
@@ -21,5 +28,84 @@ class TestXAI(unittest.TestCase):
         self.assertIn('Primary diagnosis', result['text_explanation'])
         self.assertIn('favored', result['contrastive_explanation'])
 
+    def test_explainer_follows_reloaded_model(self):
+        explainer = self.pipeline.shap
+        before = explainer.shap_values(self.sample_input)
+        registry = get_registry()
+        model = registry.get('disease_predictor')
+        reloaded = registry.load('disease_predictor')
+        registry.put('disease_predictor', reloaded)
+        try:
+            after = explainer.shap_values(self.sample_input)
+            self.assertIs(explainer.model, reloaded)
+            self.assertIs(self.pipeline.interpreter.model, reloaded)
+            self.assertIsNot(after, before)
+            self.assertEqual(explainer.cache_info().currsize, 1)
+        finally:
+            registry.put('disease_predictor', model)
+
+class TestPlotJobs(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.explainer = xai_methods.SHAPExplainer()
+        cls.sample_input = np.zeros(len(cls.explainer.symptom_names))
+        cls.sample_input[:2] = 1
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.release = threading.Event()
+        self.renders = []
+
+        def render(values, base_value, data, feature_names, class_name, paths):
+            self.renders.append(paths)
+            self.release.wait(5)
+            for path in paths.values():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(b'png')
+            return paths
+
+        # Threads instead of processes, so the renderer can be replaced
+        self.explainer._plot_pool = ThreadPoolExecutor(max_workers=2)
+        patches = [
+            mock.patch.object(xai_methods, 'PLOTS_DIR', Path(self.tmp.name)),
+            mock.patch.object(xai_methods, '_render_shap_plots', render)
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        self.release.set()
+        self.explainer.close()
+        self.tmp.cleanup()
+
+    def test_concurrent_requests_share_one_job(self):
+        first = self.explainer.submit_plots(self.sample_input)
+        second = self.explainer.submit_plots(self.sample_input)
+        self.assertIs(second, first)
+        self.release.set()
+        paths = first.future.result(5)
+        self.assertTrue(all(path.exists() for path in paths.values()))
+        self.assertEqual(len(self.renders), 1)
+
+    def test_rendered_files_are_reused(self):
+        self.release.set()
+        first = self.explainer.submit_plots(self.sample_input)
+        first.future.result(5)
+        again = self.explainer.submit_plots(self.sample_input)
+        self.assertTrue(again.future.done())
+        self.assertEqual(again.paths, first.paths)
+        self.assertEqual(len(self.renders), 1)
+
+    def test_key_includes_model_version(self):
+        self.release.set()
+        first = self.explainer.submit_plots(self.sample_input)
+        with mock.patch.object(self.explainer, 'model_version', 'another'), \
+                mock.patch.object(self.explainer, '_refresh'):
+            other = self.explainer.submit_plots(self.sample_input)
+        self.assertNotEqual(other.key, first.key)
+        other.future.result(5)
+        self.assertEqual(len(self.renders), 2)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file